@@ -1,10 +1,15 @@
 import json
 import random
+import functools
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.exceptions import NotFoundException
 from app.llms.inferenceCall import llmApiCall
 from app.agents.chatAgent.prompts import newMessagePrompt, topPicksPrompt
 from app.agents.chatAgent.tools import available_tools
+from app.agents.chatAgent.context_store import session_context
+from app.core.database import after_commit
+from app.agents.chatAgent.compactor import context_compactor
+from app.agents.chatAgent.tool_executor import ToolExecutor
 from app.models import Interaction, User, Chatsession, Product
 
 from app.utils.scrapers.scrapingfish import amazon_search, amazon_products_details, noon_search
@@ -56,7 +61,7 @@ def process_tool_call(tool_calls, messages, tool_call, response):
     messages.append(
         {
             "role": "tool",
-            "content": response,
+            "content": str(response),
             "tool_call_id": tool_call.id,
         }
     )
@@ -76,51 +81,56 @@ class ToolHandler:
         self.tool_calls = []
         self.messages = []
         self.search_keywords = []
-
-    async def handle_tool_call(self, tool_call):
-        """
-        Routes tool calls to the appropriate handler.
-        """
-        tool_name = tool_call.function.name
-        tool_args = json.loads(tool_call.function.arguments)
-
-        handlers = {
+        self.executor = ToolExecutor({
             "search_products": self.search_products,
             "display_products": self.display_products,
             "get_product_details": self.get_product_details,
             "add_to_cart": self.add_to_cart,
-        }
+        })
 
-        if tool_name in handlers:
-            return await handlers[tool_name](tool_call, tool_args)
-        else:
-            return self.unknown_tool(tool_call)
+    async def handle_tool_calls(self, tool_calls):
+        """
+        Runs the tool calls of one LLM turn concurrently and records their
+        results in the order they were issued.
+
+        Returns:
+            list: The tool messages to append to the conversation.
+        """
+        results = await self.executor.run(tool_calls)
+
+        start = len(self.messages)
+        for result in results:
+            process_tool_call(self.tool_calls, self.messages, result.tool_call, result.response)
+        return self.messages[start:]
+
+    async def handle_tool_call(self, tool_call):
+        """
+        Runs a single tool call.
+        """
+        messages = await self.handle_tool_calls([tool_call])
+        return messages[0]["content"]
 
     async def search_products(self, tool_call, tool_args):
         products = await amazon_search(country=self.country, **tool_args)
-        formatted_results = self.format_results(products)
         self.amazon_products.extend(products)
-        process_tool_call(self.tool_calls, self.messages, tool_call, formatted_results)
-        return formatted_results
+        return self.format_results(products, "amazon")
 
     async def display_products(self, tool_call, tool_args):
-        products = await display_products(self.db, **tool_args)
-        process_tool_call(self.tool_calls, self.messages, tool_call, "Products Displayed Successfully")
+        products = await self.executor.run_db(lambda: display_products(self.db, **tool_args))
         self.amazon_products.extend(products)
+        return "Products Displayed Successfully"
 
     async def get_product_details(self, tool_call, tool_args):
-        details = await amazon_products_details(db=self.db, country=self.country, **tool_args)
-        process_tool_call(self.tool_calls, self.messages, tool_call, details)
+        # Only the queries go through run_db, so the scrape runs alongside other tools
+        return await amazon_products_details(db=self.db, country=self.country, run_db=self.executor.run_db, **tool_args)
 
     async def add_to_cart(self, tool_call, tool_args):
-        cart_response = await add_to_cart(db=self.db, user_id=self.user_id, **tool_args)
-        process_tool_call(self.tool_calls, self.messages, tool_call, cart_response)
-        self.added_to_cart.extend(tool_args["productIds"])
-
-    def unknown_tool(self, tool_call):
-        response = f"Tool {tool_call.function.name} not found"
-        process_tool_call(self.tool_calls, self.messages, tool_call, response)
-        return response
+        cart_response = await self.executor.run_db(
+            lambda: add_to_cart(db=self.db, user_id=self.user_id, country=self.country, **tool_args)
+        )
+        if "error" not in cart_response:
+            self.added_to_cart.append(tool_args["productId"])
+        return cart_response
 
     @staticmethod
     def format_results(products, platform):
@@ -153,6 +163,7 @@ async def finalize_interaction(db, session_id, state, message, response):
         completion_tokens=response.usage.completion_tokens,
         total_tokens=response.usage.prompt_tokens + response.usage.completion_tokens,
     )
+    after_commit(db, functools.partial(session_context.invalidate, session_id))
 
     # Return the final response data
     return {
@@ -168,36 +179,12 @@ async def newMessageChain(db, country, user_id, session_id, message):
     state = ConversationState()
     state.messages.append({'role': 'system', 'content': newMessagePrompt})
 
-    # Load history
-    history = await Interaction.find_by_session_id(db=db, session_id=session_id)
-    for interaction in history:
-        state.messages.append({'role': 'user', 'content': interaction.prompt})
-        for tool_call in interaction.tool_calls:
-            state.messages.extend([
-                {
-                    "role": "assistant",
-                    "tool_calls": [
-                        {
-                            "id": tool_call['id'],
-                            "function": {
-                                "name": tool_call['name'],
-                                "arguments": str(tool_call['arguments']),
-                            },
-                            "type": "function",
-                        }
-                    ],
-                },
-                {
-                    "role": "tool",
-                    "content": str(tool_call['response']),
-                    "tool_call_id": tool_call['id'],
-                }
-            ])
-        if interaction.response:
-            state.messages.append({'role': 'assistant', 'content': interaction.response})
+    # Load history from the per-session context store
+    state.messages.extend(await session_context.load(db, session_id))
 
     # Append user message
     state.messages.append({'role': 'user', 'content': message})
+    state.messages, _ = context_compactor.compact(state.messages)
 
     handler = ToolHandler(db, country, user_id, session_id)
 
@@ -211,7 +198,11 @@ async def newMessageChain(db, country, user_id, session_id, message):
         reply = response.content
 
         if not _tool_calls:
-            # Final response
+            # Final response, carrying over what the tools produced
+            state.tool_calls = handler.tool_calls
+            state.amazon_products = handler.amazon_products
+            state.noon_products = handler.noon_products
+            state.added_to_cart = handler.added_to_cart
             return await finalize_interaction(
                 db=db,
                 session_id=session_id,
@@ -237,8 +228,7 @@ async def newMessageChain(db, country, user_id, session_id, message):
                 ],
             }
         )
-        for tool_call in _tool_calls:
-            await handler.handle_tool_call(tool_call)
+        state.messages.extend(await handler.handle_tool_calls(_tool_calls))
 
 async def nextNoonSearch(
         db: AsyncSession,
@@ -265,6 +255,7 @@ async def nextNoonSearch(
         tool_calls=tool_calls,
         next="top_picks"
     )
+    after_commit(db, functools.partial(session_context.invalidate, _interaction.session_id))
     return {
         "interactionId": _interaction.id,
         "amazonProducts": None,
@@ -342,6 +333,7 @@ async def nextTopPicks(
     )
     reply = response.choices[0].message.content
     await Interaction.patch(db=db, id=interaction_id, response=reply, next='complete')
+    after_commit(db, functools.partial(session_context.invalidate, session_id))
     return {
         "interactionId": interaction_id,
         "amazonProducts": None,
@@ -1,10 +1,13 @@
 import json
 import random
+import functools
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.exceptions import NotFoundException
 from app.llms.inferenceCall import llmApiCall
 from app.agents.chatAgent.prompts import newMessagePrompt, topPicksPrompt
 from app.agents.chatAgent.tools import available_tools
+from app.agents.chatAgent.context_store import session_context
+from app.core.database import after_commit
 from app.models import Interaction, User, Chatsession, Product
 
 from app.utils.scrapers.scrapingfish import amazon_search, amazon_products_details, noon_search
@@ -220,7 +223,7 @@ async def newMesssageChain(
 
             # __________ADD TO CART - TOOL CALL__________
             elif tool_name == "add_to_cart":
-                _cart = await add_to_cart(db=db,user_id=user_id,**tool_args)
+                _cart = await add_to_cart(db=db,user_id=user_id,country=country,**tool_args)
                 tool_calls.append(
                     {
                         'id': tool_call.id,
@@ -305,6 +308,8 @@ async def nextNoonSearch(
         tool_calls=tool_calls,
         next="top_picks"
     )
+    # The patched tool response is part of the cached session context
+    after_commit(db, functools.partial(session_context.invalidate, _interaction.session_id))
     return {
         "interactionId": _interaction.id,
         "amazonProducts": None,
@@ -382,6 +387,7 @@ async def nextTopPicks(
     )
     reply = response.choices[0].message.content
     await Interaction.patch(db=db, id=interaction_id, response=reply, next='complete')
+    after_commit(db, functools.partial(session_context.invalidate, session_id))
     return {
         "interactionId": interaction_id,
         "amazonProducts": None,
@@ -185,8 +185,8 @@ def add_tool_calls_to_state(state: ConversationState, tool_calls: dict):
     return state
 
 async def save_products(db: AsyncSession, products: list):
-    for product in products:
-        result = {
+    results = [
+        {
             "platform": product['platform'],
             "country": product['country'],
             "asin": product['asin'],
@@ -196,11 +196,9 @@ async def save_products(db: AsyncSession, products: list):
             "price": product['price'],
             "rating": product['rating']
         }
-        saved_product = await Product.find_by_asin(db, product["asin"])
-        if not saved_product:
-            await Product.create(db=db, **result)
-        else:
-            await Product.patch(db=db, **result)
+        for product in products
+    ]
+    await Product.bulk_upsert(db, results)
 
 async def save_interaction(db: AsyncSession, state: ConversationState, next):
     """
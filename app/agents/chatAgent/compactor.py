@@ -0,0 +1,132 @@
+import ast
+
+from app.core.config import settings
+from app.logs.logger import logger
+
+
+SEARCH_TOOL = "search_products"
+SUPERSEDED_PLACEHOLDER = "Search results omitted; superseded by a newer search."
+
+
+def estimate_tokens(messages: list[dict]) -> int:
+    """
+    Rough token count of a message list (~4 characters per token), good
+    enough to compare against the context budget without a tokenizer.
+    """
+    chars = 0
+    for message in messages:
+        chars += len(str(message.get('content') or ""))
+        for tool_call in message.get('tool_calls') or []:
+            chars += len(str(tool_call['function']['arguments']))
+    return chars // 4
+
+
+def summarize_products(content: str, max_products: int) -> str:
+    """
+    Shrinks a stored product list to one `asin | name | price` line per
+    product. Content that is not a product list is truncated instead.
+    """
+    try:
+        products = ast.literal_eval(content)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        products = None
+
+    if not isinstance(products, list) or not all(isinstance(p, dict) and 'asin' in p for p in products):
+        limit = max_products * 80
+        return content if len(content) <= limit else content[:limit] + " ..."
+
+    lines = [
+        f"{p['asin']} | {str(p.get('name') or '')[:60]} | {p.get('currency') or ''} {p.get('price')}".rstrip()
+        for p in products[:max_products]
+    ]
+    if len(products) > max_products:
+        lines.append(f"... {len(products) - max_products} more")
+    return "Search results (asin | name | price):\n" + "\n".join(lines)
+
+
+class ContextCompactor:
+    """
+    Keeps the prompt sent to the LLM within a token budget.
+
+    The system prompt and the last `recent_turns` user turns are kept
+    verbatim. In older turns, search results superseded by a later search are
+    replaced by a placeholder and the remaining tool responses are summarized
+    to ASIN, name and price. If that is still over budget the oldest turns
+    are dropped whole, so tool calls always keep their tool responses.
+    """
+
+    def __init__(self, budget: int, recent_turns: int, max_products: int):
+        self.budget = budget
+        self.recent_turns = recent_turns
+        self.max_products = max_products
+
+    @staticmethod
+    def split_turns(messages: list[dict]) -> tuple[list[dict], list[list[dict]]]:
+        head, turns = [], []
+        for message in messages:
+            if message['role'] == 'user':
+                turns.append([message])
+            elif turns:
+                turns[-1].append(message)
+            else:
+                head.append(message)
+        return head, turns
+
+    def compact_turn(self, turn: list[dict], superseded: bool) -> list[dict]:
+        tool_names = {}
+        compacted = []
+        for message in turn:
+            for tool_call in message.get('tool_calls') or []:
+                tool_names[tool_call['id']] = tool_call['function']['name']
+            if message['role'] == 'tool':
+                name = tool_names.get(message['tool_call_id'])
+                if name == SEARCH_TOOL and superseded:
+                    content = SUPERSEDED_PLACEHOLDER
+                else:
+                    content = summarize_products(str(message['content']), self.max_products)
+                message = {**message, 'content': content}
+            compacted.append(message)
+        return compacted
+
+    @staticmethod
+    def has_search(turn: list[dict]) -> bool:
+        return any(
+            tool_call['function']['name'] == SEARCH_TOOL
+            for message in turn
+            for tool_call in message.get('tool_calls') or []
+        )
+
+    def compact(self, messages: list[dict]) -> tuple[list[dict], int]:
+        """
+        Returns the compacted messages and the number of tokens saved.
+        """
+        before = estimate_tokens(messages)
+        if before <= self.budget:
+            return messages, 0
+
+        head, turns = self.split_turns(messages)
+        split = max(len(turns) - self.recent_turns, 0)
+        old, recent = turns[:split], turns[split:]
+
+        # A search is superseded when any later turn, old or recent, searched again
+        searched = [self.has_search(turn) for turn in turns]
+        compacted = [
+            self.compact_turn(turn, superseded=any(searched[i + 1:]))
+            for i, turn in enumerate(old)
+        ]
+
+        recent_messages = [message for turn in recent for message in turn]
+        while compacted and estimate_tokens(head + [m for t in compacted for m in t] + recent_messages) > self.budget:
+            compacted.pop(0)
+
+        result = head + [message for turn in compacted for message in turn] + recent_messages
+        saved = before - estimate_tokens(result)
+        logger.info(f"Context compacted: {before} -> {before - saved} tokens ({saved} saved, {len(turns) - len(compacted) - len(recent)} turns dropped)")
+        return result, saved
+
+
+context_compactor = ContextCompactor(
+    budget=settings.context_token_budget,
+    recent_turns=settings.context_recent_turns,
+    max_products=settings.context_summary_max_products,
+)
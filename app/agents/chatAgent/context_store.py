@@ -0,0 +1,107 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.models import Interaction
+from app.logs.logger import logger
+
+
+def build_turn_messages(prompt: str, tool_calls: list, response: str) -> list[dict]:
+    """
+    Converts one stored interaction into the chat messages sent to the LLM:
+    the user prompt, each tool call with its response, then the assistant reply.
+    """
+    messages = [{'role': 'user', 'content': prompt}]
+    for tool_call in tool_calls or []:
+        messages.extend([
+            {
+                "role": "assistant",
+                "tool_calls": [
+                    {
+                        "id": tool_call['id'],
+                        "function": {
+                            "name": tool_call['name'],
+                            "arguments": str(tool_call['arguments']),
+                        },
+                        "type": "function",
+                    }
+                ],
+            },
+            {
+                "role": "tool",
+                "content": str(tool_call['response']),
+                "tool_call_id": tool_call['id'],
+            }
+        ])
+    if response:
+        messages.append({'role': 'assistant', 'content': response})
+    return messages
+
+
+class SessionContextStore:
+    """
+    Per-session cache of the conversation messages (without the system prompt).
+
+    Each entry records the session's history version: the id of its latest
+    interaction and the number of patches made to its interactions. `load`
+    compares it with the database using one query, so a copy that another
+    worker's turn or patch made stale is rebuilt from the `interactions`
+    table instead of being served. A saved turn is appended once its
+    transaction commits, and only onto the version it was built on.
+    """
+
+    def __init__(self):
+        self.cache = TieredCache(
+            "session_context",
+            maxsize=settings.session_context_maxsize,
+            ttl=settings.session_context_ttl,
+        )
+
+    async def load(self, db: AsyncSession, session_id) -> list[dict]:
+        messages, _ = await self.load_versioned(db, session_id)
+        return messages
+
+    @staticmethod
+    def version(latest_id, revisions: int) -> Optional[str]:
+        return f"{latest_id}:{revisions}" if latest_id else None
+
+    async def load_versioned(self, db: AsyncSession, session_id) -> tuple[list[dict], Optional[str]]:
+        """
+        Returns the session's messages and their version (None for a new
+        session).
+        """
+        key = str(session_id)
+        version = self.version(*await Interaction.history_version(db, session_id))
+        entry = await self.cache.get(key)
+        if entry is not None and entry["version"] == version:
+            return entry["messages"], version
+
+        logger.debug(f"Session context miss, rebuilding from interactions: {key}")
+        interactions = await Interaction.find_by_session_id(db=db, session_id=session_id)
+        messages = []
+        for interaction in interactions:
+            messages.extend(build_turn_messages(interaction.prompt, interaction.tool_calls, interaction.response))
+        await self.cache.set(key, {"version": version, "messages": messages})
+        return messages, version
+
+    async def append_turn(self, session_id, base_version: Optional[str], interaction_id, prompt: str, tool_calls: list, response: str):
+        """
+        Appends a committed turn to the cached messages it was built on.
+        """
+        key = str(session_id)
+        entry = await self.cache.get(key)
+        if entry is None or entry["version"] != base_version:
+            # Not cached, or another turn landed meanwhile; the next load rebuilds it
+            return
+        entry["messages"].extend(build_turn_messages(prompt, tool_calls, response))
+        # A new interaction starts unpatched, so the revision count carries over
+        revisions = int(base_version.rsplit(":", 1)[1]) if base_version else 0
+        entry["version"] = self.version(interaction_id, revisions)
+        await self.cache.set(key, entry)
+
+    async def invalidate(self, session_id):
+        await self.cache.delete(str(session_id))
+
+
+session_context = SessionContextStore()
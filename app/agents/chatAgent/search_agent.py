@@ -1,11 +1,22 @@
 import json
 import asyncio
+import functools
+from uuid import uuid4
+from types import SimpleNamespace
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import sessionmanager, commit, rollback, after_commit
 from app.models import Interaction, User, Chatsession, Product
 from app.utils.scrapers.scrapingfish import amazon_search, amazon_products_details, noon_search
 from app.llms.inferenceCall import llmApiCall
 from app.agents.chatAgent.tools import available_tools
 from app.agents.chatAgent.prompts import newMessagePrompt
+from app.agents.chatAgent.context_store import session_context
+from app.agents.chatAgent.compactor import context_compactor
+from app.agents.chatAgent.tool_executor import ToolExecutor
+from app.utils.productUtils import add_to_cart
+from app.core.timing import timed, span, traced, start_trace, finish_trace
+from app.core.metrics import record_llm_usage
 from app.logs.logger import logger
 
 
@@ -30,10 +41,12 @@ class ConversationState:
         self.added_to_cart: list[dict] = []
         self.usage: list = []
         self.interaction_id: str = ""
+        self.context_version: str = None  # Session history version when the context was loaded
         self.user_id: str = ""  # Set to empty string initially
         self.country: str = ""  # Set to empty string initially
         self._initialize()
 
+    @timed("initialize")
     async def _initialize(self):
         """
         Asynchronously initializes the user_id and country by loading them from the database.
@@ -79,12 +92,18 @@ class DatabaseManager:
     async def find_user_by_id(self, user_id: str):
         return await User.find_by_id(self.db, user_id)
 
-    async def find_products_by_asin(self, asin: str):
-        return await Product.find_by_asin(self.db, asin)
+    async def find_products_by_asin(self, asin: str, platform: str = None, country: str = None):
+        return await Product.find_by_asin(self.db, asin, platform=platform, country=country)
+
+    async def find_products_by_asins(self, asins: list, platform: str = None, country: str = None):
+        return await Product.find_many_by_asin(self.db, asins, platform=platform, country=country)
 
     async def save_product(self, product_data: dict):
         await Product.create(self.db, **product_data)
 
+    async def save_products(self, products_data: list, update_columns: list = None):
+        return await Product.bulk_upsert(self.db, products_data, update_columns=update_columns)
+
     async def update_session_title(self, session_id: str, title: str):
         await Chatsession.update_title(self.db, session_id, title)
 
@@ -97,12 +116,34 @@ class ProductService:
     Manages product-related operations including search and save products.
     """
 
+    @timed("search_products")
+    async def search(tool_args: dict, country: str):
+        """
+        Searches Amazon and Noon in parallel.
+
+        Returns:
+            (amazon_products, noon_products): a failed marketplace yields an empty list.
+        """
+        results = await asyncio.gather(
+            timed("search.amazon")(amazon_search)(country=country, **tool_args),
+            timed("search.noon")(noon_search)(country=country, **tool_args),
+            return_exceptions=True
+        )
+        amazon_result, noon_result = results
+
+        if isinstance(amazon_result, Exception):
+            logger.error(f"Amazon search failed: {amazon_result}", exc_info=True)
+            amazon_result = []
+        if isinstance(noon_result, Exception):
+            logger.error(f"Noon search failed: {noon_result}", exc_info=True)
+            noon_result = []
+        return amazon_result, noon_result
+
     async def search_products(tool_args: dict, state: ConversationState):
         """
         Searches for products from Amazon and Noon in parallel and updates the state.
 
         Args:
-            tool_call: The tool call containing necessary information for the search.
             tool_args: Arguments required to perform the search (e.g., search query, filters).
             state: The current conversation state object containing country and product lists.
 
@@ -110,43 +151,49 @@ class ProductService:
             state: Updated state with product lists fetched from Amazon and Noon.
         """
         try:
-            # Run both Amazon and Noon searches in parallel
-            results = await asyncio.gather(
-                amazon_search(country=state.country, **tool_args),
-                noon_search(country=state.country, **tool_args),
-                return_exceptions=True
-            )
+            amazon_products, noon_products = await ProductService.search(tool_args, state.country)
 
-            # Save Search Keywords to State
+            # Save Search Keywords and products to State
             state.search_keywords.append(tool_args['keywords'])
-            
-            # Process results and update the state
-            amazon_result, noon_result = results
-
-            if isinstance(amazon_result, Exception):
-                # Log the error for Amazon search
-                logger.error(f"Amazon search failed: {amazon_result}", exc_info=True)
-            else:
-                # Update the state with products from Amazon
-                state.amazon_products.extend(amazon_result)
-
-            if isinstance(noon_result, Exception):
-                # Log the error for Noon search
-                logger.error(f"Noon search failed: {noon_result}", exc_info=True)
-            else:
-                # Update the state with products from Noon
-                state.noon_products.extend(noon_result)
-            # Return the updated state
+            state.amazon_products.extend(amazon_products)
+            state.noon_products.extend(noon_products)
             return state
         except Exception as e:
             # Log any unforeseen errors
             logger.error(f"Unexpected error occurred during product search: {e}", exc_info=True)
             return state
         
+    async def search_products_as_completed(tool_args: dict, state: ConversationState):
+        """
+        Searches Amazon and Noon in parallel, yielding each marketplace's
+        products as soon as it returns instead of waiting for both.
+
+        Yields:
+            (platform, products): "amazon" or "noon" and the list of products found.
+        """
+        async def search(platform, search_fn):
+            try:
+                with span(f"search.{platform}"):
+                    return platform, await search_fn(country=state.country, **tool_args)
+            except Exception as e:
+                logger.error(f"{platform.capitalize()} search failed: {e}", exc_info=True)
+                return platform, []
+
+        state.search_keywords.append(tool_args['keywords'])
+        searches = [search("amazon", amazon_search), search("noon", noon_search)]
+        for search_done in asyncio.as_completed(searches):
+            platform, products = await search_done
+            if platform == "amazon":
+                state.amazon_products.extend(products)
+            else:
+                state.noon_products.extend(products)
+            yield platform, products
+
     @staticmethod
+    @timed("save_products")
     async def save_products(db_manager: DatabaseManager, products: list):
-        for product in products:
-            result = {
+        results = [
+            {
                 "platform": product['platform'],
                 "country": product['country'],
                 "asin": product['asin'],
@@ -156,14 +203,23 @@ class ProductService:
                 "price": product['price'],
                 "rating": product['rating']
             }
-            existing_product = await db_manager.find_products_by_asin(product["asin"])
-            if not existing_product:
-                await db_manager.save_product(result)
+            for product in products
+        ]
+        # Refresh listing fields of known products but keep their detail-page images
+        await db_manager.save_products(results, update_columns=["name", "price_symbol", "price", "rating"])
 
     async def display_products(db_manager: DatabaseManager, productIds: list, state: ConversationState):
+        """
+        Loads the requested products in one query and adds them to the state.
+
+        Returns:
+            (products, missing): product dicts in the requested order and the asins not found.
+        """
+        found_products, missing = await db_manager.find_products_by_asins(productIds, country=state.country)
+        if missing:
+            logger.warning(f"display_products: no stored product for asins {missing}")
         products = []
-        for asin in productIds:
-            product = await db_manager.find_products_by_asin(asin)
+        for product in found_products:
             product_dict = {
                 'platform': product.platform,
                 'country': product.country,
@@ -179,6 +235,115 @@ class ProductService:
                 state.amazon_products.append(product_dict)
             else:
                 state.noon_products.append(product_dict)
+        return products, missing
+
+class ChainTools:
+    """
+    Tool handlers for one chat turn, shared by `MessageChain` and
+    `MessageChainStream` so both endpoints support the same tools.
+
+    Handlers run concurrently under `ToolExecutor` and put every use of the
+    shared session through `ToolExecutor.run_db`. Product cards are passed to `emit` as
+    soon as they are known, which the streaming chain forwards as events.
+    """
+    def __init__(self, db_manager: DatabaseManager, state: ConversationState, emit=None):
+        self.db_manager = db_manager
+        self.state = state
+        self.emit = emit or (lambda frame_type, products: None)
+        self.executor = ToolExecutor({
+            "search_products": self.search_products,
+            "display_products": self.display_products,
+            "get_product_details": self.get_product_details,
+            "add_to_cart": self.add_to_cart,
+        })
+
+    async def run(self, tool_calls: list) -> str:
+        """
+        Runs the turn's tool calls and records them on the state.
+
+        Returns:
+            The interaction's next step.
+        """
+        logger.info(f"Processing tool calls: {[tool_call.function.name for tool_call in tool_calls]}")
+        results = await self.executor.run(tool_calls)
+
+        next_step = "top_picks"
+        for result in results:
+            if result.error:
+                logger.warning(f"Tool call {result.name} did not complete: {result.error}")
+            if result.name not in self.executor.handlers:
+                next_step = "unknown_tool_call"
+            self.state.tool_calls.append(
+                {
+                    'id': result.tool_call.id,
+                    'name': result.name,
+                    'arguments': result.arguments,
+                    'response': result.response,
+                }
+            )
+        return next_step
+
+    async def search_products(self, tool_call, tool_args):
+        new_products = []
+        with span("search_products"):
+            async for platform, products in ProductService.search_products_as_completed(tool_args, self.state):
+                new_products.extend(products)
+                if products:
+                    self.emit(f"{platform}Products", products)
+
+        async def save():
+            session = await self.db_manager.find_session_by_id(self.state.session_id)
+            if session.title == "New Session":
+                new_title = (" ".join(tool_args['keywords'])[:20] + " ...") if len(" ".join(tool_args['keywords'])) > 20 else " ".join(tool_args['keywords'])
+                await self.db_manager.update_session_title(self.state.session_id, new_title)
+            logger.debug(f"Saving products to database: {new_products}")
+            await ProductService.save_products(self.db_manager, new_products)
+
+        await self.executor.run_db(save)
+        return new_products
+
+    async def display_products(self, tool_call, tool_args):
+        products, missing = await self.executor.run_db(
+            lambda: ProductService.display_products(self.db_manager, tool_args['productIds'], self.state)
+        )
+        for platform in ("amazon", "noon"):
+            platform_products = [product for product in products if product['platform'] == platform]
+            if platform_products:
+                self.emit(f"{platform}Products", platform_products)
+
+        content = f"Products Displayed Successfully:\n\n{products}"
+        if missing:
+            content += f"\n\nProducts not found: {missing}"
+        self.state.messages.append(
+            {
+                "role": "tool",
+                "content": content,
+                "tool_call_id": tool_call.id,
+            }
+        )
+        return "Products Displayed Successfully"
+
+    async def get_product_details(self, tool_call, tool_args):
+        return await amazon_products_details(
+            db=self.db_manager.db, country=self.state.country, run_db=self.executor.run_db, **tool_args
+        )
+
+    async def add_to_cart(self, tool_call, tool_args):
+        # The platform is known for products shown in this turn; otherwise the country narrows the lookup
+        platform = None
+        if any(product['asin'] == tool_args['productId'] for product in self.state.noon_products):
+            platform = "noon"
+        elif any(product['asin'] == tool_args['productId'] for product in self.state.amazon_products):
+            platform = "amazon"
+        response = await self.executor.run_db(
+            lambda: add_to_cart(
+                db=self.db_manager.db, user_id=self.state.user_id, country=self.state.country, platform=platform, **tool_args
+            )
+        )
+        if "error" not in response:
+            self.state.added_to_cart.append(tool_args['productId'])
+        return response
+
 
 class InteractionManager:
     """
@@ -187,39 +352,14 @@ class InteractionManager:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
 
+    @timed("load_session_history")
     async def load_session_history(self, state: ConversationState):
-        history = await Interaction.find_by_session_id(db=self.db_manager.db, session_id=state.session_id)
-        for interaction in history:
-            state.messages.append({'role': 'user', 'content': interaction.prompt})
-            state.history.append((interaction.prompt, interaction.response))
-
-            for tool_call in interaction.tool_calls:
-                state.messages.extend([
-                    {
-                        "role": "assistant",
-                        "tool_calls": [
-                            {
-                                "id": tool_call['id'],
-                                "function": {
-                                    "name": tool_call['name'],
-                                    "arguments": str(tool_call['arguments']),
-                                },
-                                "type": "function",
-                            }
-                        ],
-                    },
-                    {
-                        "role": "tool",
-                        "content": str(tool_call['response']),
-                        "tool_call_id": tool_call['id'],
-                    }
-                ])
-
-            if interaction.response:
-                state.messages.append({'role': 'assistant', 'content': interaction.response})
-
+        # Served from the per-session context store; rebuilt from the DB on a miss
+        messages, state.context_version = await session_context.load_versioned(self.db_manager.db, state.session_id)
+        state.messages.extend(messages)
         return state
 
+    @timed("save_interaction")
     async def save_interaction(self, state: ConversationState, next_step: str):
         reply = ""
         if state.history and len(state.history[-1]) > 1:
@@ -240,12 +380,20 @@ class InteractionManager:
             "completion_tokens": state.usage[1],
             "total_tokens": state.usage[0] + state.usage[1],
         }
+        if state.interaction_id:
+            interaction_data["id"] = state.interaction_id
         interaction = await self.db_manager.create_interaction(interaction_data)
         state.interaction_id = interaction.id
+        # Other requests must not see the turn in the context before it is committed
+        after_commit(self.db_manager.db, functools.partial(
+            session_context.append_turn,
+            state.session_id, state.context_version, interaction.id, interaction_data["prompt"], state.tool_calls, reply,
+        ))
         logger.info(f"INTERACTION SAVED:{interaction.id}")
         return state
 
 
+@timed("fetch_llm_response")
 async def fetch_llm_response(messages: list, model: str, tools: list):
     response = await llmApiCall(
         model=model,
@@ -255,15 +403,70 @@ async def fetch_llm_response(messages: list, model: str, tools: list):
     return response
 
 
+async def fetch_llm_response_stream(messages: list, model: str, tools: list):
+    response = await llmApiCall(
+        model=model,
+        messages=messages,
+        tools=tools,
+        stream=True,
+    )
+    return response
+
+
+class ToolCallAssembler:
+    """
+    Rebuilds complete tool calls from streamed `tool_calls` deltas.
+
+    Each delta carries an `index` plus fragments of the id, function name and
+    JSON arguments; fragments are concatenated per index in arrival order.
+    """
+    def __init__(self):
+        self._calls: dict[int, dict] = {}
+
+    def add(self, deltas):
+        for delta in deltas:
+            call = self._calls.setdefault(delta.index, {'id': "", 'type': "function", 'name': "", 'arguments': ""})
+            if delta.id:
+                call['id'] = delta.id
+            if delta.type:
+                call['type'] = delta.type
+            if delta.function:
+                if delta.function.name:
+                    call['name'] += delta.function.name
+                if delta.function.arguments:
+                    call['arguments'] += delta.function.arguments
+
+    @property
+    def tool_calls(self):
+        """
+        Returns the assembled calls shaped like the non-streaming
+        `message.tool_calls` (`.id`, `.type`, `.function.name`, `.function.arguments`).
+        """
+        return [
+            SimpleNamespace(
+                id=call['id'],
+                type=call['type'],
+                function=SimpleNamespace(name=call['name'], arguments=call['arguments'] or "{}"),
+            )
+            for _, call in sorted(self._calls.items())
+        ]
+
+
 class Formatter:
     """
     Formats messages and states for interactions with the app or LLM.
     """
     @staticmethod
     def add_new_message_to_state(message: str, state: ConversationState):
-        formatted_message = {'role': 'user', 'content': message}
-        state.messages.append(formatted_message)
-        state.history.append([message])
+        """
+        Opens the turn's history entry, which `save_interaction` reads the
+        prompt from. History is not loaded from the database, so this entry
+        must exist even when the message is empty.
+        """
+        if message:
+            formatted_message = {'role': 'user', 'content': message}
+            state.messages.append(formatted_message)
+        state.history.append([message or ""])
         return state
 
     @staticmethod
@@ -293,6 +496,7 @@ class Formatter:
         return interaction
 
 
+@traced("MessageChain", tags=lambda db, session_id, message: {"session_id": session_id})
 async def MessageChain(db: AsyncSession, session_id: str, message: str):
     """
     Handles the message chain, managing state, interactions, tool calls, and responses.
@@ -322,15 +526,17 @@ async def MessageChain(db: AsyncSession, session_id: str, message: str):
         logger.debug("Loading session history.")
         state = await interaction_manager.load_session_history(state)
 
-        # Add the user's new message to the state
-        if message:
-            logger.debug(f"Adding user message to state: {message}")
-            state = Formatter.add_new_message_to_state(message, state)
+        # Add the user's new message to the state; an empty message still opens the turn
+        logger.debug(f"Adding user message to state: {message}")
+        state = Formatter.add_new_message_to_state(message, state)
 
         # Initialize the messages list with a system message
         logger.debug("Adding system message to the conversation state.")
         state.messages = [{'role': 'system', 'content': newMessagePrompt}] + state.messages
 
+        # Keep the prompt within the token budget
+        state.messages, _ = context_compactor.compact(state.messages)
+
         # Fetch response from the LLM
         logger.info("Fetching response from the LLM.")
         response = await fetch_llm_response(
@@ -356,103 +562,128 @@ async def MessageChain(db: AsyncSession, session_id: str, message: str):
             state = await interaction_manager.save_interaction(state, "top_picks")
             return Formatter.format_state_for_app(state)
 
-        # Extract the first tool call for processing
-        tool_call = tool_calls[0]
-        tool_name = tool_call.function.name
-        tool_args = json.loads(tool_call.function.arguments)
-        logger.info(f"Processing tool call: {tool_name} with arguments: {tool_args}")
-
-        # Handle "search_products" tool call
-        if tool_name == "search_products":
-            try:
-                logger.info("Handling 'search_products' tool call.")
-                session = await db_manager.find_session_by_id(session_id)
-                if session.title == "New Session":
-                    state.search_keywords = tool_args['keywords']
-                    new_title = (" ".join(tool_args['keywords'])[:20] + " ...") if len(" ".join(tool_args['keywords'])) > 20 else " ".join(tool_args['keywords'])
-                    await db_manager.update_session_title(session_id, new_title)
-
-                # Search Amazon and Noon for products
-                logger.info("Searching for products on Amazon and Noon.")
-                state = await ProductService.search_products(tool_args, state)
-
-                # Save products to the database
-                new_products = state.amazon_products + state.noon_products
-                logger.debug(f"Saving products to database: {new_products}")
-                await ProductService.save_products(db_manager, new_products)
-
-                # Add tool calls to the state
-                logger.debug("Adding tool call results to the state.")
-                state = Formatter.add_tool_call_to_state(state, tool_call, new_products)
-
-                # Save the interaction
-                logger.info("Saving interaction to database.")
-                state = await interaction_manager.save_interaction(state, "top_picks")
-
-                # Format and return the response for the app
-                logger.info("Formatting state for app response.")
-                return Formatter.format_state_for_app(state)
-
-            except Exception as e:
-                logger.error(f"Error during 'search_products' tool call: {e}", exc_info=True)
-                return Formatter.format_state_for_app(state)
-
-        # Handle "display_products" tool call
-        if tool_name == "display_products":
-            try:
-                logger.info("Handling 'display_products' tool call.")
-                products = []
-                for asin in tool_args:
-                    product = await db_manager.find_products_by_asin(asin)
-                    product_dict = {
-                        'platform': product.platform,
-                        'country': product.country,
-                        'asin': product.asin,
-                        'name': product.name,
-                        'currency': product.price_symbol,
-                        'price': product.price,
-                        'images': product.images,
-                        'rating': product.rating
-                    }
-                    products.append(product_dict)
-                    if product.platform == "amazon":
-                        state.amazon_products.append(product_dict)
-                    else:
-                        state.noon_products.append(product_dict)
-                    
-                    state.tool_calls.append(
-                        {
-                            'id': tool_call.id,
-                            'name': tool_name,
-                            'arguments': tool_args,
-                            'response': "Products Displayed Successfully"
-                        }
-                    )
-                    state.messages.append(
-                        {
-                            "role": "tool",
-                            "content": f"Products Displayed Successfully:\n\n{products}",
-                            "tool_call_id": tool_call.id,
-                        }
-                    )
-                            
-                    return Formatter.format_state_for_app(state)
-
-            except Exception as e:
-                logger.error(f"Error during 'display_products' tool call: {e}", exc_info=True)
-                return Formatter.format_state_for_app(state)
+        # Run every tool call of the turn; searches first, then the tools that use their results
+        next_step = await ChainTools(db_manager, state).run(tool_calls)
 
-        # Handle other tool calls (if necessary)
-        logger.warning(f"Unrecognized tool call: {tool_name}")
-        
-        # If no recognized tool call was found, save interaction and return the state
-        state = await interaction_manager.save_interaction(state, "unknown_tool_call")
-        logger.info("Saved interaction for unrecognized tool call. Returning response.")
+        # Save the interaction
+        logger.info("Saving interaction to database.")
+        state = await interaction_manager.save_interaction(state, next_step)
         return Formatter.format_state_for_app(state)
 
     except Exception as e:
         logger.error(f"Unexpected error in MessageChain: {e}", exc_info=True)
+        # The request still commits on return, so drop what the failed turn staged
+        await rollback(db)
         # Return a fallback response in case of an error
         return {"error": "An unexpected error occurred. Please try again later."}
 
 
+def sse_event(event: str, data) -> dict:
+    return {"event": event, "data": json.dumps(jsonable_encoder(data))}
+
+
+async def MessageChainStream(session_id: str, message: str):
+    """
+    Streaming variant of `MessageChain` yielding server-sent events.
+
+    Assistant tokens are pushed as `token` events while the LLM streams,
+    product cards are pushed as `amazonProducts` / `noonProducts` events as
+    soon as each marketplace returns, and a final `done` event closes the
+    turn. Every event carries the turn's `interactionId`. The chain owns its database session because it outlives
+    the request-scoped one.
+
+    Args:
+        session_id: The current session's ID.
+        message: The message sent by the user.
+
+    Yields:
+        dicts with `event` and `data` keys, as consumed by `EventSourceResponse`.
+    """
+    trace = start_trace("MessageChainStream", session_id=session_id)
+    async with sessionmanager.session() as db:
+        try:
+            logger.info(f"Starting MessageChainStream for session_id: {session_id} with message: {message}")
+            db_manager = DatabaseManager(db)
+            state = ConversationState(db, session_id)
+            await state._initialize()
+            state.interaction_id = uuid4()
+
+            interaction_manager = InteractionManager(db_manager)
+            state = await interaction_manager.load_session_history(state)
+
+            state = Formatter.add_new_message_to_state(message, state)
+            state.messages = [{'role': 'system', 'content': newMessagePrompt}] + state.messages
+            state.messages, _ = context_compactor.compact(state.messages)
+
+            # Stream the LLM response, forwarding tokens and assembling tool calls
+            logger.info("Streaming response from the LLM.")
+            with span("fetch_llm_response_stream"):
+                stream = await fetch_llm_response_stream(
+                    model=llm_model,
+                    messages=state.messages,
+                    tools=available_tools
+                )
+                assembler = ToolCallAssembler()
+                reply = ""
+                usage = None
+                try:
+                    async for chunk in stream:
+                        if getattr(chunk, "usage", None):
+                            usage = chunk.usage
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            reply += delta.content
+                            yield sse_event("token", {"interactionId": state.interaction_id, "text": delta.content})
+                        if delta.tool_calls:
+                            assembler.add(delta.tool_calls)
+                finally:
+                    # Frees the provider slot even if the client disconnects mid-stream
+                    await stream.close()
+
+            if usage is None:
+                logger.warning("Streamed completion reported no token usage; storing 0 tokens")
+            record_llm_usage(llm_model, usage)
+            state.usage = (usage.prompt_tokens, usage.completion_tokens) if usage else (0, 0)
+            if reply:
+                state.history[-1].append(reply)
+
+            tool_calls = assembler.tool_calls
+            next_step = "top_picks"
+            if tool_calls:
+                # Same tools as MessageChain; product cards are forwarded while the tools still run
+                events = asyncio.Queue()
+                tools = ChainTools(
+                    db_manager,
+                    state,
+                    emit=lambda frame_type, products: events.put_nowait(
+                        sse_event(frame_type, {"interactionId": state.interaction_id, "products": products})
+                    ),
+                )
+
+                async def run_tools():
+                    try:
+                        return await tools.run(tool_calls)
+                    finally:
+                        events.put_nowait(None)
+
+                task = asyncio.create_task(run_tools())
+                try:
+                    while (event := await events.get()) is not None:
+                        yield event
+                    next_step = await task
+                finally:
+                    # The client went away mid-turn
+                    task.cancel()
+
+            state = await interaction_manager.save_interaction(state, next_step)
+            # Not request-scoped, so commit the turn here before reporting it done
+            await commit(db)
+            yield sse_event("done", {"interactionId": state.interaction_id, "next": True})
+
+        except Exception as e:
+            logger.error(f"Unexpected error in MessageChainStream: {e}", exc_info=True)
+            yield sse_event("error", {"error": "An unexpected error occurred. Please try again later."})
+        finally:
+            finish_trace(trace)
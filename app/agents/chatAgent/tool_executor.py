@@ -0,0 +1,111 @@
+import json
+import time
+import asyncio
+from typing import Optional
+
+from app.core.config import settings
+from app.logs.logger import logger
+
+
+# Tools run in stages; a later stage may use what an earlier one produced
+# (e.g. add_to_cart or display_products on products found by search_products).
+TOOL_STAGES = {
+    "search_products": 0,
+}
+DEFAULT_STAGE = 1
+
+
+class ToolResult:
+    """
+    Outcome of one tool call. `error` is set, and `response` holds the
+    message reported back to the LLM, when the tool failed or timed out.
+    """
+    def __init__(self, tool_call, name: str, arguments: dict, response=None, error: str = None):
+        self.tool_call = tool_call
+        self.name = name
+        self.arguments = arguments
+        self.response = response if error is None else error
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ToolExecutor:
+    """
+    Runs the tool calls of one LLM turn.
+
+    Calls in the same stage run concurrently with `asyncio.gather`, each under
+    its own timeout, so a turn costs its slowest call instead of the sum. A
+    failing or timed out call produces an error result instead of aborting
+    the others. Results are returned in the order the LLM issued the calls.
+
+    Handlers are `async def handler(tool_call, arguments)`. They share the
+    request's AsyncSession, which is not safe for concurrent use, so database
+    work inside a handler must go through `run_db`.
+    """
+
+    def __init__(self, handlers: dict, lock: Optional[asyncio.Lock] = None):
+        self.handlers = handlers
+        self.lock = lock or asyncio.Lock()
+        self._db_work: set[asyncio.Task] = set()
+
+    async def run_db(self, work):
+        """
+        Awaits `work()` on the shared session while holding `lock`.
+
+        The work runs in its own task, shielded from the calling tool's
+        timeout: cancelling a statement midway would leave the session
+        unusable for the rest of the turn. `run` waits for any such work
+        that outlived its tool before returning.
+        """
+        task = asyncio.ensure_future(self._locked(work))
+        self._db_work.add(task)
+        task.add_done_callback(self._db_work.discard)
+        return await asyncio.shield(task)
+
+    async def _locked(self, work):
+        async with self.lock:
+            return await work()
+
+    @staticmethod
+    def timeout_for(name: str) -> float:
+        return settings.tool_timeouts.get(name, settings.tool_timeout)
+
+    async def run_one(self, tool_call) -> ToolResult:
+        name = tool_call.function.name
+        try:
+            arguments = json.loads(tool_call.function.arguments or "{}")
+        except json.JSONDecodeError:
+            return ToolResult(tool_call, name, {}, error=f"Tool {name} called with invalid arguments")
+
+        handler = self.handlers.get(name)
+        if handler is None:
+            return ToolResult(tool_call, name, arguments, error=f"Tool {name} not found")
+
+        timeout = self.timeout_for(name)
+        try:
+            response = await asyncio.wait_for(handler(tool_call, arguments), timeout)
+            return ToolResult(tool_call, name, arguments, response)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {name} timed out after {timeout}s")
+            return ToolResult(tool_call, name, arguments, error=f"Tool {name} timed out")
+        except Exception as e:
+            logger.error(f"Tool {name} failed: {e}", exc_info=True)
+            return ToolResult(tool_call, name, arguments, error=f"Tool {name} failed")
+
+    async def run(self, tool_calls: list) -> list[ToolResult]:
+        start = time.perf_counter()
+        results = {}
+        stages = sorted({TOOL_STAGES.get(call.function.name, DEFAULT_STAGE) for call in tool_calls})
+        for stage in stages:
+            batch = [call for call in tool_calls if TOOL_STAGES.get(call.function.name, DEFAULT_STAGE) == stage]
+            for call, result in zip(batch, await asyncio.gather(*(self.run_one(call) for call in batch))):
+                results[call.id] = result
+        if self._db_work:
+            # Let timed out tools finish their statements before the session is used again
+            await asyncio.gather(*self._db_work, return_exceptions=True)
+
+        logger.info(f"Ran {len(tool_calls)} tool call(s) in {len(stages)} stage(s) in {time.perf_counter() - start:.2f}s")
+        return [results[call.id] for call in tool_calls]
@@ -0,0 +1,182 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-10-20 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('country', sa.String(), nullable=False),
+        sa.Column('phone', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('first_name', sa.String(), nullable=True),
+        sa.Column('last_name', sa.String(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('gender', sa.String(), nullable=False),
+        sa.Column('age_group', sa.String(), nullable=False),
+        sa.Column('password', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('is_disabled', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_users_phone', 'users', ['phone'], unique=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'blacklisttokens',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('expire', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_blacklisttokens_id', 'blacklisttokens', ['id'], unique=False)
+
+    op.create_table(
+        'products',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('platform', sa.String(), nullable=False),
+        sa.Column('country', sa.String(), nullable=False),
+        sa.Column('asin', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('images', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('price_symbol', sa.String(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('brand', sa.String(), nullable=True),
+        sa.Column('rating', sa.Float(), nullable=True),
+        sa.Column('product_category', sa.String(), nullable=True),
+        sa.Column('product_information', sa.String(), nullable=True),
+        sa.Column('feature_bullets', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('customization_options', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('is_disabled', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_products_id', 'products', ['id'], unique=False)
+
+    op.create_table(
+        'chat_sessions',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('is_disabled', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_chat_sessions_id', 'chat_sessions', ['id'], unique=False)
+
+    op.create_table(
+        'interactions',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('prompt', sa.String(), nullable=False),
+        sa.Column('tool_calls', postgresql.ARRAY(sa.JSON()), nullable=True),
+        sa.Column('search_keywords', postgresql.ARRAY(sa.JSON()), nullable=True),
+        sa.Column('amazon_products', postgresql.ARRAY(sa.JSON()), nullable=True),
+        sa.Column('noon_products', postgresql.ARRAY(sa.JSON()), nullable=True),
+        sa.Column('added_to_cart', postgresql.ARRAY(sa.JSON()), nullable=True),
+        sa.Column('response', sa.String(), nullable=True),
+        sa.Column('next', sa.String(), nullable=True),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+        sa.Column('completion_tokens', sa.Integer(), nullable=False),
+        sa.Column('total_tokens', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('session_id', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['chat_sessions.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_interactions_id', 'interactions', ['id'], unique=False)
+
+    op.create_table(
+        'profiles',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('fav_categories', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('cart', postgresql.ARRAY(sa.JSON()), nullable=True),
+        sa.Column('wishlist', postgresql.ARRAY(sa.JSON()), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('is_onboarded', sa.Boolean(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_profiles_id', 'profiles', ['id'], unique=False)
+
+    op.create_table(
+        'fashion_profiles',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('relation', sa.String(), nullable=True),
+        sa.Column('age', sa.Integer(), nullable=True),
+        sa.Column('weight', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('chest_shape', sa.String(), nullable=True),
+        sa.Column('abdomen_shape', sa.String(), nullable=True),
+        sa.Column('hip_shape', sa.String(), nullable=True),
+        sa.Column('fitting', sa.String(), nullable=True),
+        sa.Column('bra_sizing', sa.String(), nullable=True),
+        sa.Column('bra_underband', sa.Integer(), nullable=True),
+        sa.Column('bra_cup', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_fashion_profiles_id', 'fashion_profiles', ['id'], unique=False)
+
+    op.create_table(
+        'checkouts',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('platform', sa.String(), nullable=False),
+        sa.Column('country', sa.String(), nullable=False),
+        sa.Column('link_type', sa.String(), nullable=True),
+        sa.Column('products', postgresql.ARRAY(sa.JSON()), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_checkouts_id', 'checkouts', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_checkouts_id', table_name='checkouts')
+    op.drop_table('checkouts')
+    op.drop_index('ix_fashion_profiles_id', table_name='fashion_profiles')
+    op.drop_table('fashion_profiles')
+    op.drop_index('ix_profiles_id', table_name='profiles')
+    op.drop_table('profiles')
+    op.drop_index('ix_interactions_id', table_name='interactions')
+    op.drop_table('interactions')
+    op.drop_index('ix_chat_sessions_id', table_name='chat_sessions')
+    op.drop_table('chat_sessions')
+    op.drop_index('ix_products_id', table_name='products')
+    op.drop_table('products')
+    op.drop_index('ix_blacklisttokens_id', table_name='blacklisttokens')
+    op.drop_table('blacklisttokens')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_phone', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,62 @@
+"""product composite key and lookup indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-10-20 12:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep one row per (platform, country, asin): prefer rows that already hold
+    # scraped details, then the most recently created one.
+    op.execute(
+        """
+        DELETE FROM products p
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY platform, country, asin
+                ORDER BY (feature_bullets IS NOT NULL) DESC, created_at DESC, id
+            ) AS rn
+            FROM products
+        ) d
+        WHERE p.id = d.id AND d.rn > 1
+        """
+    )
+
+    # Build the indexes without locking writes on live tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_platform_country_asin', 'products', ['platform', 'country', 'asin'],
+            unique=True, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_interactions_session_id_timestamp', 'interactions', ['session_id', 'timestamp'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_chat_sessions_user_id_created_at', 'chat_sessions', ['user_id', 'created_at'],
+            postgresql_concurrently=True,
+        )
+        op.create_index('ix_profiles_user_id', 'profiles', ['user_id'], postgresql_concurrently=True)
+        op.create_index('ix_checkouts_user_id', 'checkouts', ['user_id'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_checkouts_user_id', table_name='checkouts', postgresql_concurrently=True)
+        op.drop_index('ix_profiles_user_id', table_name='profiles', postgresql_concurrently=True)
+        op.drop_index('ix_chat_sessions_user_id_created_at', table_name='chat_sessions', postgresql_concurrently=True)
+        op.drop_index('ix_interactions_session_id_timestamp', table_name='interactions', postgresql_concurrently=True)
+        op.drop_index('ix_products_platform_country_asin', table_name='products', postgresql_concurrently=True)
@@ -0,0 +1,43 @@
+"""profile cart and wishlist as jsonb
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-10-27 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # json[] -> jsonb array, so items can be appended and removed in one UPDATE
+    for column in ('cart', 'wishlist'):
+        op.alter_column(
+            'profiles', column,
+            type_=postgresql.JSONB(),
+            postgresql_using=f"COALESCE(to_jsonb({column}), '[]'::jsonb)",
+            server_default=sa.text("'[]'::jsonb"),
+            nullable=False,
+        )
+
+
+def downgrade() -> None:
+    # USING cannot hold a subquery, so rebuild each array through a new column
+    for column in ('cart', 'wishlist'):
+        op.add_column('profiles', sa.Column(f'{column}_array', postgresql.ARRAY(sa.JSON()), nullable=True))
+        op.execute(
+            f"UPDATE profiles SET {column}_array = "
+            f"ARRAY(SELECT value::json FROM jsonb_array_elements({column}))"
+        )
+        op.drop_column('profiles', column)
+        op.alter_column('profiles', f'{column}_array', new_column_name=column)
@@ -0,0 +1,104 @@
+"""cart_items and wishlist_items tables
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-11-03 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cart_items',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('product_id', sa.UUID(), nullable=False),
+        sa.Column('quantity', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('added_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'product_id'),
+    )
+    op.create_index('ix_cart_items_user_id_added_at', 'cart_items', ['user_id', 'added_at'], unique=False)
+
+    op.create_table(
+        'wishlist_items',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('product_id', sa.UUID(), nullable=False),
+        sa.Column('added_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'product_id'),
+    )
+    op.create_index('ix_wishlist_items_user_id_added_at', 'wishlist_items', ['user_id', 'added_at'], unique=False)
+
+    # Copy the product snapshots kept in profiles, in their original order.
+    # A product listed n times becomes one row: quantity n in the cart, once in
+    # the wishlist, dated by its latest position. Snapshots whose product is no
+    # longer stored are dropped.
+    for column, table, quantity in (('cart', 'cart_items', True), ('wishlist', 'wishlist_items', False)):
+        op.execute(
+            f"""
+            INSERT INTO {table} (user_id, product_id, {'quantity, ' if quantity else ''}added_at)
+            SELECT s.user_id, s.product_id, {'count(*), ' if quantity else ''}now() - min(s.age) * interval '1 second'
+            FROM (
+                SELECT pr.user_id, p.id AS product_id, jsonb_array_length(pr.{column}) - e.ord AS age
+                FROM profiles pr
+                CROSS JOIN LATERAL jsonb_array_elements(pr.{column}) WITH ORDINALITY AS e(item, ord)
+                JOIN products p
+                  ON p.platform = COALESCE(e.item->>'platform', 'amazon')
+                 AND p.country = COALESCE(e.item->>'country', 'ae')
+                 AND p.asin = e.item->>'asin'
+                WHERE pr.user_id IS NOT NULL AND NOT COALESCE(pr.is_deleted, false)
+            ) s
+            GROUP BY s.user_id, s.product_id
+            """
+        )
+
+
+def downgrade() -> None:
+    # Write the items back to the profile columns as product snapshots, repeating
+    # cart products by quantity, so that the previous release sees them again
+    for column, table, repeat in (
+        ('cart', 'cart_items', 'CROSS JOIN generate_series(1, i.quantity)'),
+        ('wishlist', 'wishlist_items', ''),
+    ):
+        op.execute(
+            f"""
+            UPDATE profiles pr
+            SET {column} = COALESCE((
+                SELECT jsonb_agg(
+                    jsonb_build_object(
+                        'platform', p.platform,
+                        'country', p.country,
+                        'asin', p.asin,
+                        'images', p.images,
+                        'name', left(p.name, 25),
+                        'price_symbol', p.price_symbol,
+                        'price', p.price
+                    )
+                    ORDER BY i.added_at
+                )
+                FROM {table} i
+                JOIN products p ON p.id = i.product_id
+                {repeat}
+                WHERE i.user_id = pr.user_id
+            ), '[]'::jsonb)
+            WHERE pr.user_id IS NOT NULL
+            """
+        )
+
+    op.drop_index('ix_wishlist_items_user_id_added_at', table_name='wishlist_items')
+    op.drop_table('wishlist_items')
+    op.drop_index('ix_cart_items_user_id_added_at', table_name='cart_items')
+    op.drop_table('cart_items')
@@ -0,0 +1,27 @@
+"""interaction revision counter
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-11-10 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Constant default, so Postgres adds the column without rewriting the table
+    op.add_column('interactions', sa.Column('revision', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('interactions', 'revision')
@@ -0,0 +1,85 @@
+import time
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class TokenBlacklist:
+    """
+    In-memory set of revoked token ids (jti).
+
+    Logouts in this process are added immediately; the full set is reloaded
+    from the `blacklisttokens` table at most every `refresh_interval` seconds
+    so revocations made by other workers are picked up without a query per
+    request. Local additions made while a reload query runs are kept, as the
+    query may not have seen them.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._revoked: dict[str, datetime] = {}
+        self._added_at: dict[str, float] = {}
+        self._refreshed_at: Optional[float] = None
+
+    def needs_refresh(self) -> bool:
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.refresh_interval
+
+    def replace(self, tokens: Iterable[tuple[str, datetime]], started_at: float):
+        """
+        Swaps in the set loaded by a query started at `started_at`
+        (`time.monotonic()`), keeping tokens added locally since then.
+        """
+        revoked = {str(jti): expire for jti, expire in tokens}
+        self._added_at = {jti: added_at for jti, added_at in self._added_at.items() if added_at >= started_at}
+        for jti in self._added_at:
+            revoked[jti] = self._revoked[jti]
+        self._revoked = revoked
+        self._refreshed_at = time.monotonic()
+
+    def add(self, jti: str, expire: datetime):
+        self._revoked[str(jti)] = expire
+        self._added_at[str(jti)] = time.monotonic()
+
+    def is_revoked(self, jti: str) -> bool:
+        return str(jti) in self._revoked
+
+
+class UserCache:
+    """
+    Short-lived cache of authenticated `User` rows keyed by token jti.
+
+    Entries are detached instances; callers merge them into their session.
+    An index by phone lets `User` writes invalidate every token of that user;
+    it is pruned as entries leave the cache, so it never outgrows it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._users = TTLCache(maxsize=maxsize, ttl=ttl, on_evict=self._unindex)
+        self._jtis_by_phone: dict[str, set[str]] = {}
+
+    def _unindex(self, jti: str, user: Any):
+        jtis = self._jtis_by_phone.get(user.phone)
+        if jtis is not None:
+            jtis.discard(jti)
+            if not jtis:
+                del self._jtis_by_phone[user.phone]
+
+    def get(self, jti: str) -> Optional[Any]:
+        return self._users.get(str(jti))
+
+    def set(self, jti: str, user: Any):
+        self._users.set(str(jti), user)
+        self._jtis_by_phone.setdefault(user.phone, set()).add(str(jti))
+
+    def invalidate_token(self, jti: str):
+        self._users.delete(str(jti))
+
+    def invalidate_user(self, phone: str):
+        for jti in self._jtis_by_phone.pop(phone, set()):
+            self._users.delete(jti)
+
+
+revoked_tokens = TokenBlacklist(refresh_interval=settings.auth_blacklist_refresh_interval)
+user_cache = UserCache(maxsize=settings.auth_user_cache_maxsize, ttl=settings.auth_user_cache_ttl)
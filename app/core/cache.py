@@ -0,0 +1,164 @@
+import copy
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    In-process LRU cache with a per-entry time to live.
+
+    `on_evict(key, value)` is called whenever an entry leaves the cache:
+    on expiry, LRU eviction, deletion, or when its key is set again.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, on_evict: Optional[Callable[[str, Any], None]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def _evicted(self, key: str, entry: Optional[tuple[float, Any]]):
+        if entry is not None and self.on_evict is not None:
+            self.on_evict(key, entry[1])
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self._evicted(key, entry)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._evicted(key, self._data.pop(key, None))
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        while len(self._data) > self.maxsize:
+            self._evicted(*self._data.popitem(last=False))
+
+    def delete(self, key: str):
+        self._evicted(key, self._data.pop(key, None))
+
+    def clear(self):
+        while self._data:
+            self._evicted(*self._data.popitem(last=False))
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SharedCache:
+    """
+    Optional cross-process tier backed by Redis.
+
+    Enabled only when `settings.redis_url` is set; the `redis` package is
+    imported lazily so the app runs without it. Values are stored as JSON.
+    """
+
+    def __init__(self, url: str, namespace: str):
+        self.url = url
+        self.namespace = namespace
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+            self._client = redis.from_url(self.url)
+        return self._client
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self.client.get(f"{self.namespace}:{key}")
+        except Exception as e:
+            logger.warning(f"Shared cache get failed for {self.namespace}: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        try:
+            await self.client.set(f"{self.namespace}:{key}", json.dumps(value, default=str), ex=int(ttl))
+        except Exception as e:
+            logger.warning(f"Shared cache set failed for {self.namespace}: {e}")
+
+    async def delete(self, key: str):
+        try:
+            await self.client.delete(f"{self.namespace}:{key}")
+        except Exception as e:
+            logger.warning(f"Shared cache delete failed for {self.namespace}: {e}")
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+
+class TieredCache:
+    """
+    In-process LRU/TTL tier in front of an optional shared tier.
+
+    Reads check the local tier first and promote shared hits into it. Values
+    are deep-copied on the way in and out so callers can mutate what they get.
+    Hit and miss counters are kept per tier.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, shared: bool = True):
+        self.name = name
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.shared = SharedCache(settings.redis_url, namespace=name) if shared and settings.redis_url else None
+        self.hits = {"local": 0, "shared": 0}
+        self.misses = 0
+        caches[name] = self
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            self.hits["local"] += 1
+            return copy.deepcopy(value)
+        if self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                self.hits["shared"] += 1
+                self.local.set(key, value)
+                return copy.deepcopy(value)
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.local.set(key, copy.deepcopy(value), ttl)
+        if self.shared is not None:
+            await self.shared.set(key, value, ttl or self.ttl)
+
+    async def delete(self, key: str):
+        self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(key)
+
+    def stats(self) -> dict:
+        hits = self.hits["local"] + self.hits["shared"]
+        lookups = hits + self.misses
+        return {
+            "size": len(self.local),
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+    async def close(self):
+        if self.shared is not None:
+            await self.shared.close()
+
+
+# Registry of every TieredCache by name, for stats and shutdown
+caches: dict[str, TieredCache] = {}
@@ -1,6 +1,9 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv, find_dotenv
 import os
+import tempfile
+from typing import Optional
 
 
 # Load environmental variables from the .env file
@@ -15,9 +18,116 @@ debug_logs = os.environ.get('debug_logs')
 class Settings(BaseSettings):
     database_url: str = DATABASE_URL
     echo_sql: bool = False
+
+    # Async DB engine pool; prepared statements and server settings apply to asyncpg only
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_prepared_statement_cache_size: int = 500
+    db_server_settings: dict[str, str] = {"jit": "off", "application_name": "arobah_api"}
+    db_warmup_connections: int = 5
     test: bool = False
     project_name: str = "Arobah Backend"
     oauth_token_secret: str = "my_dev_secret"
 
+    # Shared HTTP transport used by the scrapers
+    scraper_max_connections: int = 100
+    scraper_max_connections_per_host: int = 20
+    scraper_max_keepalive_connections: int = 20
+    scraper_keepalive_expiry: float = 30.0
+    scraper_timeout: float = 60.0
+    scraper_connect_timeout: float = 10.0
+    scraper_retries: int = 2
+    scraper_retry_backoff: float = 0.5
+    scraper_singleflight_timeout: float = 90.0
+
+    # Image proxy: pooled upstream client and content-addressed disk cache
+    image_max_connections: int = 100
+    image_max_connections_per_host: int = 8
+    image_max_keepalive_connections: int = 32
+    image_timeout: float = 20.0
+    image_connect_timeout: float = 5.0
+    image_cache_dir: str = os.path.join(tempfile.gettempdir(), "arobah_image_cache")
+    image_cache_max_bytes: int = 2 * 1024 ** 3
+    image_cache_max_age: int = 7 * 24 * 3600
+    # Only these hosts are proxied; "*.example.com" also matches subdomains
+    image_allowed_hosts: list[str] = ["m.media-amazon.com", "*.nooncdn.com"]
+    image_max_body_bytes: int = 15 * 1024 ** 2
+    image_max_redirects: int = 3
+    # Downloads waiting per host (beyond image_max_connections_per_host) before prefetches are refused
+    image_fetch_queue_size: int = 200
+    # Resized variants: requested widths are rounded up to one of these
+    image_widths: list[int] = [96, 160, 240, 320, 480, 640, 800, 1080, 1600]
+    image_default_quality: int = 75
+    image_resize_timeout: float = 30.0
+
+    # Upstream scraping APIs
+    scraping_api_url: str = "https://scraping.narf.ai/api/v1/"
+    scraperapi_url: str = "https://api.scraperapi.com/"
+
+    # Local stand-in for the scraping and LLM APIs (app.devtools.fake_backend).
+    # When set, every upstream URL points at it; latencies are "fixed:s",
+    # "uniform:a,b", "normal:mu,sigma" or "lognormal:median,sigma" in seconds.
+    fake_backend_url: Optional[str] = None
+    fake_scraper_latency: str = "lognormal:2.0,0.4"
+    fake_llm_latency: str = "lognormal:0.8,0.3"
+
+    # Process pool for CPU-bound parsing; 0 runs the work in a thread instead
+    worker_processes: int = 2
+
+    # Optional JSON file overriding the built-in extraction rules (see extraction_rules.py)
+    extraction_rules_path: Optional[str] = None
+
+    # Pooled LLM provider clients
+    openai_base_url: str = "https://api.openai.com/v1"
+    llm_http2: bool = True
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry: float = 60.0
+    llm_timeout: float = 120.0
+    llm_connect_timeout: float = 10.0
+    openai_max_concurrency: int = 32
+    groq_max_concurrency: int = 16
+
+    # Caching; the shared (Redis) tier is used only when redis_url is set
+    redis_url: Optional[str] = None
+    search_cache_ttl: int = 900
+    search_cache_maxsize: int = 1024
+    session_context_ttl: int = 1800
+    session_context_maxsize: int = 2000
+
+    # Chat prompt compaction; older tool responses are summarized past the budget
+    context_token_budget: int = 6000
+    context_recent_turns: int = 2
+    context_summary_max_products: int = 10
+
+    # Per-tool timeouts (seconds) for the chat agent's tool calls
+    tool_timeout: float = 60.0
+    tool_timeouts: dict[str, float] = {
+        "search_products": 90.0,
+        "get_product_details": 60.0,
+        "display_products": 10.0,
+        "add_to_cart": 10.0,
+    }
+
+    # JWT authentication caches
+    auth_user_cache_ttl: int = 60
+    auth_user_cache_maxsize: int = 10000
+    auth_blacklist_refresh_interval: int = 30
+
+    # Bearer token required by /metrics; the endpoints are disabled while unset
+    metrics_token: Optional[str] = None
+
+    @model_validator(mode="after")
+    def use_fake_backend(self):
+        if self.fake_backend_url:
+            base = self.fake_backend_url.rstrip("/")
+            self.scraping_api_url = f"{base}/scrapingfish/"
+            self.scraperapi_url = f"{base}/scraperapi/"
+            self.openai_base_url = f"{base}/openai/v1"
+        return self
+
 
 settings = Settings()  # type: ignore
@@ -1,7 +1,12 @@
+import asyncio
+import inspect
 import contextlib
-from typing import Any, AsyncIterator, Annotated
+from typing import Any, AsyncIterator, Annotated, Callable
 
 from app.core.config import settings
+from app.logs.logger import logger
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
     AsyncSession,
@@ -13,10 +18,33 @@ from fastapi import Depends
 
 Base = declarative_base()
 
+
+def engine_options(host: str) -> dict[str, Any]:
+    """
+    Pool and driver options for `create_async_engine` from the settings.
+    """
+    options = {
+        "echo": settings.echo_sql,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if make_url(host).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+            "server_settings": settings.db_server_settings,
+        }
+    return options
+
+
 class DatabaseSessionManager:
     def __init__(self, host: str, engine_kwargs: dict[str, Any] = {}):
         self._engine = create_async_engine(host, **engine_kwargs)
-        self._sessionmaker = async_sessionmaker(autocommit=False, bind=self._engine)
+        # Model methods only flush; the caller commits once per unit of work.
+        # Objects stay usable after that commit without a reload.
+        self._sessionmaker = async_sessionmaker(autocommit=False, expire_on_commit=False, bind=self._engine)
 
     async def close(self):
         if self._engine is None:
@@ -26,6 +54,39 @@ class DatabaseSessionManager:
         self._engine = None
         self._sessionmaker = None
 
+    def pool_stats(self) -> dict[str, Any]:
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        pool = self._engine.pool
+        if not hasattr(pool, "checkedout"):
+            # NullPool / StaticPool keep no counters
+            return {"pool": type(pool).__name__}
+        return {
+            "pool": type(pool).__name__,
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": settings.db_max_overflow,
+        }
+
+    async def warm_up(self, connections: int):
+        """
+        Opens `connections` connections at once and returns them to the pool,
+        so the first requests after startup don't pay for connecting.
+        """
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        async def ping(stack: contextlib.AsyncExitStack):
+            connection = await stack.enter_async_context(self._engine.connect())
+            await connection.execute(text("SELECT 1"))
+
+        async with contextlib.AsyncExitStack() as stack:
+            await asyncio.gather(*(ping(stack) for _ in range(connections)))
+        logger.info(f"Database pool warmed up: {self.pool_stats()}")
+
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
         if self._engine is None:
@@ -47,18 +108,52 @@ class DatabaseSessionManager:
         try:
             yield session
         except Exception:
-            await session.rollback()
+            await rollback(session)
             raise
         finally:
             await session.close()
 
 
-sessionmanager = DatabaseSessionManager(settings.database_url, {"echo": settings.echo_sql})
+sessionmanager = DatabaseSessionManager(settings.database_url, engine_options(settings.database_url))
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], Any]):
+    """
+    Defers `callback` (sync or async) until the session's unit of work
+    commits, for side effects such as cache updates that must not be seen
+    before the rows they describe. Dropped if the session rolls back.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def commit(session: AsyncSession):
+    """
+    Commits the session, then runs the callbacks registered with `after_commit`.
+    """
+    await session.commit()
+    for callback in session.info.pop("after_commit", []):
+        try:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            # The data is already committed; a failed side effect must not fail the request
+            logger.error(f"after_commit callback failed: {e!r}", exc_info=True)
+
+
+async def rollback(session: AsyncSession):
+    session.info.pop("after_commit", None)
+    await session.rollback()
 
 
 async def get_db_session():
+    """
+    Request-scoped unit of work: everything the endpoint staged is committed
+    once when it returns, and rolled back if it raises.
+    """
     async with sessionmanager.session() as session:
         yield session
+        await commit(session)
 
 
 
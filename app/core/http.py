@@ -0,0 +1,151 @@
+import asyncio
+import contextlib
+import logging
+from typing import Any, AsyncIterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def redact_url(url) -> str:
+    """
+    Drops the query string, which carries the scraping APIs' `api_key`.
+    """
+    return str(url).split("?", 1)[0]
+
+
+def raise_for_status(response: httpx.Response):
+    """
+    Like `Response.raise_for_status`, with the query string left out of the
+    error message so credentials in it do not reach the logs.
+    """
+    if response.is_success:
+        return
+    request = response.request
+    raise httpx.HTTPStatusError(
+        f"{response.status_code} {response.reason_phrase} for {request.method} {redact_url(request.url)}",
+        request=request,
+        response=response,
+    )
+
+
+class HttpClientManager:
+    """
+    Process-wide pooled HTTP client.
+
+    A single keep-alive `httpx.AsyncClient` is shared by every caller so that
+    TLS handshakes and connections are reused across requests. Concurrency per
+    upstream host is capped with a semaphore unless `max_connections_per_host`
+    is None (for callers that schedule per-host work themselves), and transient
+    failures (transport errors and 429/5xx responses) are retried with
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_connections_per_host: Optional[int],
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        timeout: float,
+        connect_timeout: float,
+        retries: int,
+        backoff: float,
+    ):
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._max_connections_per_host = max_connections_per_host
+        self._retries = retries
+        self._backoff = backoff
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self._limits,
+                timeout=self._timeout,
+                follow_redirects=True,
+            )
+        return self._client
+
+    def _host_semaphore(self, url: str):
+        if self._max_connections_per_host is None:
+            return contextlib.nullcontext()
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                async with self._host_semaphore(url):
+                    response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self._retries:
+                    raise_for_status(response)
+                    return response
+                logger.warning(f"{method} {redact_url(url)} returned {response.status_code}, retrying ({attempt + 1}/{self._retries})")
+            except httpx.TransportError as e:
+                if attempt >= self._retries:
+                    raise
+                logger.warning(f"{method} {redact_url(url)} failed with {e!r}, retrying ({attempt + 1}/{self._retries})")
+            await asyncio.sleep(self._backoff * 2 ** attempt)
+            attempt += 1
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """
+        Streams a response body without buffering it. The host's slot is
+        held until the body is consumed; streams are not retried.
+        """
+        async with self._host_semaphore(url):
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._host_semaphores = {}
+
+
+scraperclient = HttpClientManager(
+    max_connections=settings.scraper_max_connections,
+    max_connections_per_host=settings.scraper_max_connections_per_host,
+    max_keepalive_connections=settings.scraper_max_keepalive_connections,
+    keepalive_expiry=settings.scraper_keepalive_expiry,
+    timeout=settings.scraper_timeout,
+    connect_timeout=settings.scraper_connect_timeout,
+    retries=settings.scraper_retries,
+    backoff=settings.scraper_retry_backoff,
+)
+
+# ImageProxy queues downloads per host by priority, so no FIFO host cap here
+imageclient = HttpClientManager(
+    max_connections=settings.image_max_connections,
+    max_connections_per_host=None,
+    max_keepalive_connections=settings.image_max_keepalive_connections,
+    keepalive_expiry=settings.scraper_keepalive_expiry,
+    timeout=settings.image_timeout,
+    connect_timeout=settings.image_connect_timeout,
+    retries=0,
+    backoff=0.0,
+)
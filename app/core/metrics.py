@@ -0,0 +1,158 @@
+import time
+import functools
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core.cache import caches
+from app.core.database import sessionmanager
+
+# First path segment -> router label. Anything else is counted as "other"
+# so unknown paths cannot blow up the label cardinality.
+ROUTER_PREFIXES = {
+    "auth": "auth",
+    "chat": "chat",
+    "account": "profile",
+    "cart": "cart",
+    "wishlist": "wishlist",
+    "checkout": "checkout",
+    "product": "product",
+    "image": "image",
+    "metrics": "metrics",
+    "static": "static",
+}
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0)
+
+registry = CollectorRegistry()
+
+http_requests = Counter(
+    "arobah_http_requests_total", "HTTP requests handled, per router.",
+    ["router", "method", "status"], registry=registry,
+)
+http_latency = Histogram(
+    "arobah_http_request_duration_seconds", "HTTP request duration until the response body is sent, per router.",
+    ["router"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+llm_requests = Counter(
+    "arobah_llm_requests_total", "LLM chat completion calls, per model.",
+    ["model", "outcome"], registry=registry,
+)
+llm_latency = Histogram(
+    "arobah_llm_request_duration_seconds", "LLM call duration; for streams, the time until the stream opens.",
+    ["model", "stream"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+llm_tokens = Counter(
+    "arobah_llm_tokens_total", "LLM tokens used, per model.",
+    ["model", "kind"], registry=registry,
+)
+scraper_requests = Counter(
+    "arobah_scraper_requests_total", "Scraper calls, per platform and operation.",
+    ["platform", "operation", "outcome"], registry=registry,
+)
+scraper_latency = Histogram(
+    "arobah_scraper_request_duration_seconds", "Scraper call duration, per platform and operation.",
+    ["platform", "operation"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+
+
+def router_label(path: str) -> str:
+    return ROUTER_PREFIXES.get(path.strip("/").split("/", 1)[0], "other")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and their latency per router.
+
+    Timing stops when the response body has been sent, so streamed chat
+    responses are measured over their whole duration.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        router = router_label(scope["path"])
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests.labels(router, scope["method"], str(status)).inc()
+            http_latency.labels(router).observe(time.perf_counter() - start)
+
+
+def record_llm_usage(model: str, usage):
+    if usage is None:
+        return
+    llm_tokens.labels(model, "prompt").inc(usage.prompt_tokens)
+    llm_tokens.labels(model, "completion").inc(usage.completion_tokens)
+
+
+def scraper_metrics(platform: str, operation: str):
+    """
+    Decorator counting calls, failures and latency of an async scraper function.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                scraper_requests.labels(platform, operation, outcome).inc()
+                scraper_latency.labels(platform, operation).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class RuntimeCollector:
+    """
+    Reads DB pool usage and cache counters at scrape time.
+    """
+
+    def collect(self):
+        if sessionmanager._engine is not None:
+            stats = sessionmanager.pool_stats()
+            size = GaugeMetricFamily("arobah_db_pool_size", "Configured DB pool size.")
+            checked_out = GaugeMetricFamily("arobah_db_pool_checked_out", "DB connections in use.")
+            checked_in = GaugeMetricFamily("arobah_db_pool_checked_in", "Idle DB connections in the pool.")
+            overflow = GaugeMetricFamily("arobah_db_pool_overflow", "DB connections opened beyond the pool size.")
+            if "size" in stats:
+                size.add_metric([], stats["size"])
+                checked_out.add_metric([], stats["checked_out"])
+                checked_in.add_metric([], stats["checked_in"])
+                overflow.add_metric([], stats["overflow"])
+            yield from (size, checked_out, checked_in, overflow)
+
+        hits = CounterMetricFamily("arobah_cache_hits", "Cache hits, per cache and tier.", labels=["cache", "tier"])
+        misses = CounterMetricFamily("arobah_cache_misses", "Cache misses, per cache.", labels=["cache"])
+        ratio = GaugeMetricFamily("arobah_cache_hit_ratio", "Lifetime cache hit ratio, per cache.", labels=["cache"])
+        for name, cache in sorted(caches.items()):
+            stats = cache.stats()
+            for tier, count in stats["hits"].items():
+                hits.add_metric([name, tier], count)
+            misses.add_metric([name], stats["misses"])
+            ratio.add_metric([name], stats["hit_ratio"])
+        yield from (hits, misses, ratio)
+
+
+registry.register(RuntimeCollector())
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(registry), CONTENT_TYPE_LATEST
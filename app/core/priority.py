@@ -0,0 +1,75 @@
+import asyncio
+import heapq
+import itertools
+from typing import Optional
+
+
+class Ticket:
+    """
+    A place in a `PriorityLimiter` queue. Lower priorities go first.
+    """
+
+    __slots__ = ("priority", "seq", "future")
+
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.future: Optional[asyncio.Future] = None
+
+    def __lt__(self, other: "Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class PriorityLimiter:
+    """
+    Semaphore whose waiters are admitted by priority, then arrival order.
+
+    At most `limit` holders run at once. A released slot is handed straight
+    to the best waiting ticket, so a burst of low-priority work queued first
+    does not delay high-priority work that arrives later. A waiting ticket
+    can be promoted when a more urgent caller comes to depend on it.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active = 0
+        self._waiters: list[Ticket] = []
+        self._seq = itertools.count()
+
+    def ticket(self, priority: int) -> Ticket:
+        return Ticket(priority, next(self._seq))
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for ticket in self._waiters if not ticket.future.done())
+
+    async def acquire(self, ticket: Ticket):
+        if self._active < self.limit and not self.waiting:
+            self._active += 1
+            return
+        ticket.future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, ticket)
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if not ticket.future.cancelled():
+                # The slot was handed over just as we were cancelled
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            ticket = heapq.heappop(self._waiters)
+            if not ticket.future.done():
+                ticket.future.set_result(None)
+                return
+        self._active -= 1
+
+    def promote(self, ticket: Ticket, priority: int):
+        if priority < ticket.priority:
+            ticket.priority = priority
+            if ticket.future is not None and not ticket.future.done():
+                heapq.heapify(self._waiters)
+
+    def stats(self) -> dict:
+        return {"active": self._active, "waiting": self.waiting, "limit": self.limit}
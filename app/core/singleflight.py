@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one in-flight execution.
+
+    The first caller for a key starts the call; every caller arriving while it
+    is in flight awaits the same task and receives the same result or
+    exception. The shared task is shielded so a disconnecting waiter does not
+    cancel it for the others, and it is bounded by a per-key timeout.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[..., Awaitable[Any]],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.wait_for(fn(*args, **kwargs), timeout or self.timeout))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def __len__(self):
+        return len(self._inflight)
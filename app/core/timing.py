@@ -0,0 +1,153 @@
+import json
+import time
+import functools
+import contextlib
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+
+from app.logs.logger import logger
+
+
+class RollingHistogram:
+    """
+    Keeps the last `window` durations of a stage for percentile summaries,
+    plus lifetime count and total.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": self.count}
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 4)
+
+        return {
+            "count": self.count,
+            "mean": round(sum(ordered) / len(ordered), 4),
+            "p50": pct(50),
+            "p95": pct(95),
+            "p99": pct(99),
+            "max": round(ordered[-1], 4),
+        }
+
+
+class RequestTrace:
+    """
+    Spans recorded while handling one request, logged as one structured
+    line when the request finishes.
+    """
+
+    def __init__(self, name: str, **tags):
+        self.name = name
+        self.tags = tags
+        self.started = time.perf_counter()
+        self.spans: list[dict] = []
+
+    def add(self, stage: str, start: float, seconds: float, error: bool):
+        span = {"stage": stage, "offset": round(start - self.started, 4), "seconds": round(seconds, 4)}
+        if error:
+            span["error"] = True
+        self.spans.append(span)
+
+    def breakdown(self) -> dict:
+        return {
+            "trace": self.name,
+            **{key: str(value) for key, value in self.tags.items()},
+            "total": round(time.perf_counter() - self.started, 4),
+            "spans": self.spans,
+        }
+
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+# Rolling per-stage histograms, exposed by /metrics/stages
+stage_histograms: dict[str, RollingHistogram] = {}
+
+
+def observe(stage: str, seconds: float):
+    histogram = stage_histograms.get(stage)
+    if histogram is None:
+        histogram = stage_histograms[stage] = RollingHistogram()
+    histogram.observe(seconds)
+
+
+@contextlib.contextmanager
+def span(stage: str):
+    """
+    Times a block: the duration goes to the stage's histogram and, inside
+    a request trace, to its breakdown. Works in sync and async code.
+    """
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        observe(stage, seconds)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add(stage, start, seconds, error)
+
+
+def timed(stage: str):
+    """
+    Decorator form of `span` for async functions and methods.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace(name: str, **tags) -> RequestTrace:
+    trace = RequestTrace(name, **tags)
+    current_trace.set(trace)
+    return trace
+
+
+def finish_trace(trace: RequestTrace):
+    breakdown = trace.breakdown()
+    observe(trace.name, breakdown["total"])
+    logger.info(f"TIMING {json.dumps(breakdown)}")
+
+
+def traced(name: str, tags=None):
+    """
+    Decorator that records a request trace around an async function and
+    logs its timing breakdown when it returns. `tags`, if given, is called
+    with the function's arguments and returns extra fields for the log line.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            trace = RequestTrace(name, **(tags(*args, **kwargs) if tags else {}))
+            token = current_trace.set(trace)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                current_trace.reset(token)
+                finish_trace(trace)
+        return wrapper
+    return decorator
+
+
+def stage_summaries() -> dict:
+    return {stage: histogram.summary() for stage, histogram in sorted(stage_histograms.items())}
@@ -0,0 +1,55 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPoolManager:
+    """
+    Process pool for CPU-bound work (HTML parsing, image processing) that
+    would otherwise block the event loop.
+
+    The pool is created on first use and recreated if a worker dies. With
+    `max_workers=0` the work runs in the default thread pool instead, which
+    keeps the loop responsive but shares the GIL.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs `fn(*args, **kwargs)` off the event loop. `fn` and its
+        arguments must be picklable (module-level functions and plain data).
+        """
+        call = functools.partial(fn, *args, **kwargs)
+        if self.max_workers <= 0:
+            return await asyncio.to_thread(call)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), call)
+        except BrokenProcessPool:
+            logger.warning("Worker pool broken, restarting it")
+            self.close()
+            return await loop.run_in_executor(self._get_pool(), call)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+process_pool = WorkerPoolManager(max_workers=settings.worker_processes)
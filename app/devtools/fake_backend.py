@@ -0,0 +1,190 @@
+"""
+Local stand-in for the paid upstream APIs, for load testing the chat pipeline.
+
+Serves recorded pages from `app/utils/scrapers/` in place of scraping.narf.ai
+and ScraperAPI, and canned OpenAI chat completions (search tool call for a
+new user message, a short text reply after tool results), each delayed by a
+configurable latency distribution.
+
+    uvicorn app.devtools.fake_backend:app --port 8900
+    FAKE_BACKEND_URL=http://127.0.0.1:8900 uvicorn app.main:app --port 4567
+"""
+import json
+import math
+import time
+import random
+import asyncio
+from pathlib import Path
+from typing import Callable
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sse_starlette.sse import EventSourceResponse
+
+from app.core.config import settings
+from app.utils.scrapers.html_sample import html_sample
+
+FIXTURES = Path(__file__).resolve().parent.parent / "utils" / "scrapers" / "fixtures"
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Turns "fixed:s", "uniform:a,b", "normal:mu,sigma" or
+    "lognormal:median,sigma" (seconds) into a sampler.
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+scraper_latency = parse_latency(settings.fake_scraper_latency)
+llm_latency = parse_latency(settings.fake_llm_latency)
+
+amazon_search_extract = json.loads((FIXTURES / "scrapingfish_amazon_search.json").read_text())
+amazon_details_extract = {
+    "feature_bullet": [
+        "Full-size layout with dedicated media controls",
+        "Per-key RGB lighting with onboard memory",
+        "Spill-resistant, durable construction",
+    ],
+    "images": [
+        {"link": "https://m.media-amazon.com/images/I/71Cq6ZlAkIL._AC_US40_.jpg"},
+        {"link": "https://m.media-amazon.com/images/I/81aw4JzP1bL._AC_US40_.jpg"},
+    ],
+}
+
+app = FastAPI(title="Arobah fake backend")
+
+
+# ______________________ Scraping APIs ______________________
+
+@app.get("/scrapingfish/")
+async def scrapingfish(url: str, extract_rules: str = None):
+    await asyncio.sleep(scraper_latency())
+    if "noon.com" in url:
+        return PlainTextResponse(html_sample)
+    if "/dp/" in url:
+        return JSONResponse(amazon_details_extract)
+    return JSONResponse(amazon_search_extract)
+
+
+@app.get("/scraperapi/")
+async def scraperapi(url: str):
+    await asyncio.sleep(scraper_latency())
+    if "noon.com" in url:
+        # ScraperAPI returns the rendered page as a JSON string
+        return JSONResponse(html_sample)
+    if "/dp/" in url:
+        return JSONResponse({
+            "name": amazon_search_extract["products"][1]["name"],
+            "images": [image["link"] for image in amazon_details_extract["images"]],
+            "feature_bullets": amazon_details_extract["feature_bullet"],
+            "average_rating": 4.5,
+        })
+    return JSONResponse({
+        "results": [
+            {
+                "asin": product["asin"].split(':')[0].split('.')[-1],
+                "name": product["name"],
+                "image": product["image"],
+                "price_symbol": product["currency"],
+                "price": float(product["price"].replace(',', '')),
+                "stars": float(product["rating"].split(' ')[0]),
+            }
+            for product in amazon_search_extract["products"]
+            if product["asin"] and product["price"] and product["rating"]
+        ]
+    })
+
+
+# ______________________ OpenAI chat completions ______________________
+
+def completion_message(body: dict) -> dict:
+    """
+    Search for a new user message, answer in text once tool results are in.
+    """
+    last = body["messages"][-1]
+    if last["role"] == "user" and body.get("tools"):
+        keywords = str(last.get("content") or "products").split()[:3]
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{uuid4().hex[:24]}",
+                "type": "function",
+                "function": {
+                    "name": "search_products",
+                    "arguments": json.dumps({"keywords": keywords, "search_index": "All"}),
+                },
+            }],
+        }
+    return {"role": "assistant", "content": "Here are a few options that match what you are looking for."}
+
+
+def usage_for(body: dict, message: dict) -> dict:
+    # Same ~4 characters per token estimate as the context compactor
+    prompt_tokens = sum(len(str(m.get("content") or "")) for m in body["messages"]) // 4
+    completion_tokens = len(json.dumps(message)) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def stream_chunks(body: dict, message: dict, completion_id: str, created: int):
+    base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": body["model"]}
+    if message.get("tool_calls"):
+        call = message["tool_calls"][0]
+        deltas = [{"role": "assistant", "tool_calls": [{"index": 0, **call}]}]
+        finish_reason = "tool_calls"
+    else:
+        words = message["content"].split(" ")
+        deltas = [{"role": "assistant", "content": ""}]
+        deltas += [{"content": word if i == 0 else f" {word}"} for i, word in enumerate(words)]
+        finish_reason = "stop"
+    for delta in deltas:
+        yield {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]}
+    yield {**base, "choices": [], "usage": usage_for(body, message)}
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    message = completion_message(body)
+    completion_id = f"chatcmpl-{uuid4().hex[:24]}"
+    created = int(time.time())
+
+    if body.get("stream"):
+        async def events():
+            # Time to first token, then a steady trickle
+            await asyncio.sleep(llm_latency())
+            for chunk in stream_chunks(body, message, completion_id, created):
+                yield {"data": json.dumps(chunk)}
+                await asyncio.sleep(0.01)
+            yield {"data": "[DONE]"}
+        return EventSourceResponse(events())
+
+    await asyncio.sleep(llm_latency())
+    return JSONResponse({
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": body["model"],
+        "choices": [{
+            "index": 0,
+            "message": message,
+            "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+        }],
+        "usage": usage_for(body, message),
+    })
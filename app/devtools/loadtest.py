@@ -0,0 +1,161 @@
+"""
+Load generator for the chat API.
+
+Drives a running instance of the app through its real routers, normally
+started against `app.devtools.fake_backend`, and reports latency
+percentiles and throughput per endpoint.
+
+    python -m app.devtools.loadtest --phone 201000000000 --password secret \\
+        --requests 200 --concurrency 20 --endpoints new_message,new_message_stream,get_sessions
+
+The user must exist and be verified. Each worker opens its own chat session.
+"""
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from collections import defaultdict
+
+import httpx
+
+MESSAGES = [
+    "mechanical keyboard under 2000",
+    "wireless gaming mouse",
+    "noise cancelling headphones",
+    "running shoes for men",
+    "4k monitor for work",
+]
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, token: str):
+        self.client = client
+        self.token = token
+        self.latencies = defaultdict(list)
+        self.first_event = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def new_session(self) -> str:
+        response = await self.client.post("/chat/new_session", json={"token": self.token, "title": "New Session"})
+        response.raise_for_status()
+        return response.json()["session_id"]
+
+    async def new_message(self, session_id: str, message: str):
+        response = await self.client.post(
+            "/chat/new_message",
+            json={"token": self.token, "session_id": session_id, "message": message},
+        )
+        response.raise_for_status()
+
+    async def new_message_stream(self, session_id: str, message: str) -> float:
+        """
+        Reads the event stream to its `done` event; returns the time to the
+        first event.
+        """
+        start = time.perf_counter()
+        first_event = None
+        async with self.client.stream(
+            "POST", "/chat/new_message/stream",
+            json={"token": self.token, "session_id": session_id, "message": message},
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("event:"):
+                    continue
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                event = line.split(":", 1)[1].strip()
+                if event == "error":
+                    raise RuntimeError("stream reported an error event")
+                if event == "done":
+                    break
+        return first_event
+
+    async def get_sessions(self, session_id: str, message: str):
+        response = await self.client.get("/chat/get_sessions", params={"token": self.token})
+        response.raise_for_status()
+
+    async def worker(self, endpoints: list, requests: int, counter: list):
+        session_id = await self.new_session()
+        while True:
+            if counter[0] >= requests:
+                return
+            n = counter[0]
+            counter[0] += 1
+            endpoint = endpoints[n % len(endpoints)]
+            message = MESSAGES[n % len(MESSAGES)]
+            start = time.perf_counter()
+            try:
+                first_event = await getattr(self, endpoint)(session_id, message)
+                self.latencies[endpoint].append(time.perf_counter() - start)
+                if first_event is not None:
+                    self.first_event[endpoint].append(first_event)
+            except Exception as e:
+                self.errors[endpoint] += 1
+                print(f"{endpoint} failed: {e!r}", file=sys.stderr)
+
+    def report(self, elapsed: float):
+        print(f"\n{'endpoint':20} {'ok':>5} {'err':>4} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'mean s':>8} {'req/s':>7}")
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies[endpoint]
+            if values:
+                print(f"{endpoint:20} {len(values):5} {self.errors[endpoint]:4} "
+                      f"{percentile(values, 50):8.3f} {percentile(values, 95):8.3f} {percentile(values, 99):8.3f} "
+                      f"{statistics.mean(values):8.3f} {len(values) / elapsed:7.2f}")
+            else:
+                print(f"{endpoint:20} {0:5} {self.errors[endpoint]:4}")
+        for endpoint, values in self.first_event.items():
+            print(f"{endpoint + ' first event':33} p50 {percentile(values, 50):.3f}s  p95 {percentile(values, 95):.3f}s  p99 {percentile(values, 99):.3f}s")
+        total = sum(len(v) for v in self.latencies.values())
+        print(f"\n{total} requests in {elapsed:.1f}s, {total / elapsed:.2f} req/s overall")
+
+
+async def login(client: httpx.AsyncClient, phone: str, password: str) -> str:
+    response = await client.post("/auth/token", data={"username": phone, "password": password})
+    response.raise_for_status()
+    return response.json()["access"]["token"]
+
+
+async def run(args) -> int:
+    endpoints = args.endpoints.split(",")
+    for endpoint in endpoints:
+        if not hasattr(LoadTest, endpoint):
+            print(f"Unknown endpoint {endpoint!r}", file=sys.stderr)
+            return 2
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        token = args.token or await login(client, args.phone, args.password)
+        test = LoadTest(client, token)
+        counter = [0]
+        start = time.perf_counter()
+        await asyncio.gather(*(test.worker(endpoints, args.requests, counter) for _ in range(args.concurrency)))
+        test.report(time.perf_counter() - start)
+    return 1 if any(test.errors.values()) else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:4567")
+    parser.add_argument("--token", help="access token; otherwise log in with --phone/--password")
+    parser.add_argument("--phone")
+    parser.add_argument("--password")
+    parser.add_argument("--requests", type=int, default=100, help="total requests across workers")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent workers")
+    parser.add_argument("--endpoints", default="new_message", help="comma separated: new_message, new_message_stream, get_sessions")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args(argv)
+    if not args.token and not (args.phone and args.password):
+        parser.error("pass --token or --phone and --password")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
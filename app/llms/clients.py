@@ -0,0 +1,129 @@
+import asyncio
+import contextlib
+import logging
+import os
+from typing import Any, AsyncIterator, Callable, Optional
+
+import httpx
+import openai
+from dotenv import load_dotenv
+from groq import AsyncGroq
+
+from app.core.config import settings
+
+# Load environment variables from the .env file
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") or "sk-XXXX"
+GROQ_API_KEY = os.getenv("GROQ_API_KEY") or "sk-XXXX"
+
+logger = logging.getLogger(__name__)
+
+
+class HeldStream:
+    """
+    A streamed completion that keeps its provider slot until the stream is
+    read to the end or closed, so streamed calls count against the
+    provider's concurrency cap for as long as they use a connection.
+    """
+
+    def __init__(self, stream: Any, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._release is None:
+            return
+        release, self._release = self._release, None
+        try:
+            await self._stream.close()
+        finally:
+            release()
+
+
+class LLMClientRegistry:
+    """
+    Holds one long-lived client per LLM provider.
+
+    Clients are created in `main.lifespan` and share a keep-alive HTTP/2
+    connection pool, so agent turns reuse warm connections instead of paying
+    a TLS handshake per call. Each provider also gets a semaphore that bounds
+    the number of in-flight requests.
+    """
+
+    def __init__(self):
+        self._clients: dict[str, openai.AsyncOpenAI | AsyncGroq] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=settings.llm_http2,
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+                keepalive_expiry=settings.llm_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(settings.llm_timeout, connect=settings.llm_connect_timeout),
+        )
+
+    def start(self):
+        if self._clients:
+            return
+        self._clients["openai"] = openai.AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=settings.openai_base_url,
+            http_client=self._http_client(),
+        )
+        self._clients["groq"] = AsyncGroq(
+            api_key=GROQ_API_KEY,
+            http_client=self._http_client(),
+        )
+        self._semaphores["openai"] = asyncio.Semaphore(settings.openai_max_concurrency)
+        self._semaphores["groq"] = asyncio.Semaphore(settings.groq_max_concurrency)
+        logger.info("LLM client registry started")
+
+    def get(self, provider: str) -> openai.AsyncOpenAI | AsyncGroq:
+        # Lazily start so scripts running outside the app lifespan still work
+        if not self._clients:
+            self.start()
+        return self._clients[provider]
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, provider: str) -> AsyncIterator[openai.AsyncOpenAI | AsyncGroq]:
+        client = self.get(provider)
+        async with self._semaphores[provider]:
+            yield client
+
+    async def stream(self, provider: str, **kwargs: Any) -> HeldStream:
+        """
+        Starts a streamed chat completion. Unlike `acquire`, the provider
+        slot is only released once the returned stream is consumed or closed.
+        """
+        client = self.get(provider)
+        semaphore = self._semaphores[provider]
+        await semaphore.acquire()
+        try:
+            stream = await client.chat.completions.create(stream=True, **kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+        return HeldStream(stream, semaphore.release)
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.close()
+        self._clients = {}
+        self._semaphores = {}
+
+
+llm_clients = LLMClientRegistry()
@@ -3,7 +3,7 @@ import os
 import logging
 from typing import List, Dict
 
-from groq import AsyncGroq
+from app.llms.clients import llm_clients
 from app.schemas.chatcompletion import ChatCompletionResponse, ChatCompletionRequest
 
 
@@ -31,22 +31,34 @@ async def create_chat_completions(
         max_tokens: int, # = 2000,
         tools: List[Dict]
 ):
-    # Set your OpenAI API key & API URL
-    client = AsyncGroq(
-        api_key=GROQ_API_KEY
-    )
-    # Make the API request and return the full response
-    response = await client.chat.completions.create(
-        messages=messages,
-        model=model,
-        stop=stop,
-        stream=stream,
-        temperature=temperature,
-        top_p=top_p,
-        max_tokens=max_tokens,
-        tool_choice="auto",
-        tools=tools
-    )
+    if stream:
+        # The provider slot stays held until the caller finishes reading the stream
+        return await llm_clients.stream(
+            "groq",
+            messages=messages,
+            model=model,
+            stop=stop,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            tool_choice="auto",
+            tools=tools
+        )
+
+    # Reuse the pooled client created in main.lifespan
+    async with llm_clients.acquire("groq") as client:
+        # Make the API request and return the full response
+        response = await client.chat.completions.create(
+            messages=messages,
+            model=model,
+            stop=stop,
+            stream=stream,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            tool_choice="auto",
+            tools=tools
+        )
     return response
     '''
     try:
@@ -1,7 +1,9 @@
 import json
+import time
 from typing import List, Dict
 #from app.llms.groqApi import create_chat_completions
 from app.llms.openaiApi import create_chat_completions
+from app.core.metrics import llm_requests, llm_latency, record_llm_usage
 
 async def llmApiCall(
         messages: str,
@@ -23,5 +25,15 @@ async def llmApiCall(
         'max_tokens': max_tokens,
         'tools': tools
     }
-    response = await create_chat_completions(**params)
+    start = time.perf_counter()
+    try:
+        response = await create_chat_completions(**params)
+    except Exception:
+        llm_requests.labels(model, "error").inc()
+        raise
+    llm_requests.labels(model, "ok").inc()
+    llm_latency.labels(model, str(stream).lower()).observe(time.perf_counter() - start)
+    # Streamed usage arrives with the last chunk and is recorded by the caller
+    if not stream:
+        record_llm_usage(model, response.usage)
     return response
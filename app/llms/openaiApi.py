@@ -7,6 +7,8 @@ import openai
 from sse_starlette import EventSourceResponse
 from typing import List, Dict
 
+from app.llms.clients import llm_clients
+
 # Load environment variables from the .env file
 load_dotenv()
 
@@ -50,23 +52,36 @@ async def create_chat_completions(
     Returns:
     - async generator: An async generator that yields the full response from the OpenAI Chat API, including information such as 'id', 'object', 'created', 'model', 'usage', and 'choices'.
     """
-    # Set your OpenAI API key & API URL
-    client = openai.AsyncOpenAI(
-        api_key=API_KEY
-    )
-
-    # Make the API request and return the full response or yield the response stream
-    response = await client.chat.completions.create(
-        messages=messages,
-        model=model,
-        stop=stop,
-        stream=stream,
-        temperature=temperature,
-        top_p=top_p,
-        max_tokens=max_tokens,
-        tool_choice="auto",
-        tools=tools
-    )
+    if stream:
+        # The provider slot stays held until the caller finishes reading the stream
+        return await llm_clients.stream(
+            "openai",
+            messages=messages,
+            model=model,
+            stop=stop,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            tool_choice="auto",
+            tools=tools,
+            # Streams carry no usage unless asked for; it arrives in a final chunk without choices
+            extra_body={"stream_options": {"include_usage": True}}
+        )
+
+    # Reuse the pooled client created in main.lifespan
+    async with llm_clients.acquire("openai") as client:
+        # Make the API request and return the full response or yield the response stream
+        response = await client.chat.completions.create(
+            messages=messages,
+            model=model,
+            stop=stop,
+            stream=stream,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            tool_choice="auto",
+            tools=tools
+        )
     print(response)
     return response
 
@@ -9,6 +9,12 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.database import sessionmanager
+from app.core.http import scraperclient, imageclient
+from app.core.cache import caches
+from app.core.workers import process_pool
+from app.logs.logger import logger
+from app.core.metrics import MetricsMiddleware
+from app.llms.clients import llm_clients
 from app.routers.auth import router as auth_router
 from app.routers.chat import router as chat_router
 from app.routers.profile import router as profile_router
@@ -17,6 +23,7 @@ from app.routers.wishlist import router as wishlist_router
 from app.routers.checkout import router as checkout_router
 from app.routers.product import router as product_router
 from app.routers.images import router as images_router
+from app.routers.metrics import router as metrics_router
 
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 
@@ -27,10 +34,29 @@ async def lifespan(app: FastAPI):
     Function that handles startup and shutdown events.
     To understand more, read https://fastapi.tiangolo.com/advanced/events/
     """
+    # Open the pooled LLM provider clients
+    llm_clients.start()
+    # Open DB connections ahead of the first requests
+    if settings.db_warmup_connections:
+        try:
+            await sessionmanager.warm_up(settings.db_warmup_connections)
+        except Exception as e:
+            logger.warning(f"Database warm-up failed: {e}")
     yield
     if sessionmanager._engine is not None:
         # Close the DB connection
         await sessionmanager.close()
+    # Close the pooled scraper connections
+    await scraperclient.close()
+    # Close the pooled image proxy connections
+    await imageclient.close()
+    # Close the pooled LLM provider clients
+    await llm_clients.close()
+    # Close the shared cache tiers
+    for cache in caches.values():
+        await cache.close()
+    # Stop the parsing worker processes
+    process_pool.close()
 
 
 app = FastAPI(lifespan=lifespan, title=settings.project_name, docs_url="/api/docs")
@@ -47,6 +73,9 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],
 )
 
+# Request count and latency per router, served at /metrics
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/")
 async def root():
     # Read the HTML file and return it as a response
@@ -62,6 +91,7 @@ app.include_router(wishlist_router)
 app.include_router(checkout_router)
 app.include_router(product_router)
 app.include_router(images_router)
+app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
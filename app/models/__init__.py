@@ -11,3 +11,4 @@ from .fashion_profile import FashionProfile
 from .checkout import Checkout
 
 
+from .cart_item import CartItem, WishlistItem
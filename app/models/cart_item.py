@@ -0,0 +1,143 @@
+# app/models/cart_item.py
+from typing import List
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UUID, Index, select, delete, func, literal, tuple_, values, column, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import Base
+from .product import Product
+
+
+class ProductListMixin:
+    """
+    Queries shared by the per-user product lists. Items are addressed by
+    the product key the app already holds, (platform, country, asin), and
+    resolved to product ids inside each statement.
+    """
+
+    @classmethod
+    async def page(cls, db: AsyncSession, user_id: UUID, limit: int, offset: int = 0):
+        """
+        One page of the list, newest first, joined with the product fields
+        the app renders. Returns (items, has_more).
+        """
+        query = (
+            select(
+                Product.platform,
+                Product.country,
+                Product.asin,
+                Product.name,
+                Product.images[1].label("image"),
+                Product.price_symbol,
+                Product.price,
+                *([cls.quantity] if hasattr(cls, "quantity") else []),
+                cls.added_at,
+            )
+            .join(Product, Product.id == cls.product_id)
+            .where(cls.user_id == user_id)
+            .order_by(cls.added_at.desc(), cls.product_id)
+            .limit(limit + 1)
+            .offset(offset)
+        )
+        result = await db.execute(query)
+        rows = [dict(row) for row in result.mappings()]
+        return rows[:limit], len(rows) > limit
+
+    @classmethod
+    async def add(cls, db: AsyncSession, user_id: UUID, refs: List[dict]) -> int:
+        """
+        Adds the referenced products in one INSERT ... SELECT. Products
+        already in the list are kept; in the cart their quantity grows.
+        Unknown products are ignored. Returns the number of rows written.
+        """
+        quantities = {}
+        for ref in refs:
+            key = (ref["platform"], ref["country"], ref["asin"])
+            quantities[key] = quantities.get(key, 0) + ref.get("quantity", 1)
+        if not quantities:
+            return 0
+
+        rows = values(
+            column("platform", String), column("country", String), column("asin", String), column("quantity", Integer),
+            name="refs",
+        ).data([(*key, quantity) for key, quantity in quantities.items()])
+        counted = hasattr(cls, "quantity")
+        columns = ["user_id", "product_id"] + (["quantity"] if counted else [])
+        selected = [literal(user_id, UUID(as_uuid=True)), Product.id] + ([rows.c.quantity] if counted else [])
+        source = select(*selected).join(
+            rows,
+            and_(Product.platform == rows.c.platform, Product.country == rows.c.country, Product.asin == rows.c.asin),
+        )
+
+        stmt = insert(cls).from_select(columns, source)
+        if counted:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[cls.user_id, cls.product_id],
+                set_={"quantity": cls.quantity + stmt.excluded.quantity},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[cls.user_id, cls.product_id])
+
+        result = await db.execute(stmt)
+        return result.rowcount
+
+    @classmethod
+    def _where_refs(cls, user_id: UUID, refs: List[dict]):
+        keys = [(ref["platform"], ref["country"], ref["asin"]) for ref in refs]
+        product_ids = select(Product.id).where(tuple_(Product.platform, Product.country, Product.asin).in_(keys))
+        return and_(cls.user_id == user_id, cls.product_id.in_(product_ids))
+
+    @classmethod
+    async def remove(cls, db: AsyncSession, user_id: UUID, refs: List[dict]) -> int:
+        if not refs:
+            return 0
+        result = await db.execute(
+            delete(cls).where(cls._where_refs(user_id, refs)).execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @classmethod
+    async def move_to(cls, db: AsyncSession, target, user_id: UUID, refs: List[dict]) -> int:
+        """
+        Moves the referenced products from this list to `target` with one
+        DELETE ... RETURNING feeding an INSERT. Products already in `target`
+        are only removed here. Returns the number of rows inserted.
+        """
+        if not refs:
+            return 0
+        moved = (
+            delete(cls)
+            .where(cls._where_refs(user_id, refs))
+            .returning(cls.user_id, cls.product_id)
+            .cte("moved")
+        )
+        stmt = (
+            insert(target)
+            .from_select(["user_id", "product_id"], select(moved.c.user_id, moved.c.product_id))
+            .on_conflict_do_nothing(index_elements=[target.user_id, target.product_id])
+        )
+        result = await db.execute(stmt.execution_options(synchronize_session=False))
+        return result.rowcount
+
+
+class CartItem(ProductListMixin, Base):
+    __tablename__ = "cart_items"
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=1, server_default="1")
+    added_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_cart_items_user_id_added_at", "user_id", "added_at"),
+    )
+
+
+class WishlistItem(ProductListMixin, Base):
+    __tablename__ = "wishlist_items"
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    added_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_wishlist_items_user_id_added_at", "user_id", "added_at"),
+    )
@@ -1,6 +1,6 @@
 # app/models/chat_session.py
 from uuid import uuid4
-from sqlalchemy import Column, String, select, DateTime, Boolean, func, UUID, ForeignKey, desc
+from sqlalchemy import Column, String, select, DateTime, Boolean, func, UUID, ForeignKey, desc, Index
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import relationship
 
@@ -16,13 +16,16 @@ class Chatsession(Base):
     is_disabled = Column(Boolean, default=False)
     
     interactions = relationship("Interaction", foreign_keys="Interaction.session_id")
+
+    __table_args__ = (
+        Index("ix_chat_sessions_user_id_created_at", "user_id", "created_at"),
+    )
         
     @classmethod
     async def create(cls, db: AsyncSession, **kwargs):
         new_session = cls(**kwargs)
         db.add(new_session)
-        await db.commit()
-        await db.refresh(new_session)
+        await db.flush()
         return new_session
         
     @classmethod
@@ -43,8 +46,7 @@ class Chatsession(Base):
         if session is None:
             return None
         session.is_disabled = True
-        await db.commit()
-        await db.refresh(session)
+        await db.flush()
         return session
 
     @classmethod
@@ -54,6 +56,5 @@ class Chatsession(Base):
         session = result.scalars().first()
         if session:
             session.title = title
-            await db.commit()
-            await db.refresh(session)
+            await db.flush()
         return session
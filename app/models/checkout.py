@@ -13,7 +13,7 @@ class Checkout(Base):
     link_type = Column(String, nullable=True)
     products = Column(ARRAY(JSON), nullable=True)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)
     is_deleted = Column(Boolean, default=False)
 
     @classmethod
@@ -34,8 +34,7 @@ class Checkout(Base):
             products=products,
         )
         db.add(new_checkout)
-        await db.commit()
-        await db.refresh(new_checkout)
+        await db.flush()
         return new_checkout
 
     @classmethod
@@ -69,8 +68,7 @@ class Checkout(Base):
                 checkout.link_type = link_type
             if products is not None:
                 checkout.products = products
-            await db.commit()
-            await db.refresh(checkout)
+            await db.flush()
         return checkout
     
     @classmethod
@@ -81,6 +79,5 @@ class Checkout(Base):
         checkout = result.scalars().first()
         if checkout:
             checkout.is_deleted = True
-            await db.commit()
-            await db.refresh(checkout)
+            await db.flush()
         return checkout
@@ -61,8 +61,7 @@ class FashionProfile(Base):
             bra_cup=bra_cup,
         )
         db.add(new_profile)
-        await db.commit()
-        await db.refresh(new_profile)
+        await db.flush()
         return new_profile
 
     @classmethod
@@ -79,6 +78,5 @@ class FashionProfile(Base):
             for key, value in kwargs.items():
                 if value is not None:
                     setattr(profile, key, value)
-            await db.commit()
-            await db.refresh(profile)
+            await db.flush()
         return profile
@@ -1,7 +1,7 @@
 # app/models/interaction.py
 
 from uuid import uuid4
-from sqlalchemy import Column, String, select, DateTime, Boolean, func, ForeignKey, UUID, Integer, ARRAY, JSON
+from sqlalchemy import Column, String, select, DateTime, Boolean, func, ForeignKey, UUID, Integer, ARRAY, JSON, Index
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import NoResultFound
 
@@ -26,10 +26,17 @@ class Interaction(Base):
     timestamp = Column(DateTime, nullable=False, server_default=func.now())
     session_id = Column(UUID(as_uuid=True), ForeignKey("chat_sessions.id"))
     is_deleted = Column(Boolean, default=False)
+    # Bumped by every patch, so cached session context can tell it is stale
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_interactions_session_id_timestamp", "session_id", "timestamp"),
+    )
 
     @classmethod
-    async def create(cls, db: AsyncSession, session_id: UUID, prompt: str, response: str, model: str, prompt_tokens: int, completion_tokens: int, total_tokens: int, tool_calls: list[dict], next: str, search_keywords: list[dict], amazon_products: list[dict], noon_products: list[dict], added_to_cart: list[dict]):
+    async def create(cls, db: AsyncSession, session_id: UUID, prompt: str, response: str, model: str, prompt_tokens: int, completion_tokens: int, total_tokens: int, tool_calls: list[dict], next: str, search_keywords: list[dict], amazon_products: list[dict], noon_products: list[dict], added_to_cart: list[dict], id: UUID = None):
         new_interaction = cls(
+            id=id or uuid4(),
             session_id=session_id,
             prompt=prompt,
             response=response,
@@ -45,8 +52,7 @@ class Interaction(Base):
             added_to_cart=added_to_cart,
         )
         db.add(new_interaction)
-        await db.commit()
-        await db.refresh(new_interaction)
+        await db.flush()
         return new_interaction
 
     @classmethod
@@ -55,6 +61,20 @@ class Interaction(Base):
         interactions = result.scalars().all()
         return interactions
 
+    @classmethod
+    async def history_version(cls, db: AsyncSession, session_id: UUID):
+        """
+        Returns (latest interaction id, total revisions) for the session, which
+        changes whenever an interaction is added or patched; (None, 0) if empty.
+        """
+        latest_id = (
+            select(cls.id).filter(cls.session_id == session_id).order_by(cls.timestamp.desc()).limit(1)
+        ).scalar_subquery()
+        result = await db.execute(
+            select(latest_id, func.coalesce(func.sum(cls.revision), 0)).filter(cls.session_id == session_id)
+        )
+        return tuple(result.one())
+
     @classmethod
     async def find_last_n_by_session_id(cls, db: AsyncSession, session_id: UUID, n: int):
         result = await db.execute(
@@ -87,10 +107,11 @@ class Interaction(Base):
             for key, value in kwargs.items():
                 if hasattr(interaction, key):
                     setattr(interaction, key, value)
+            # Incremented in SQL so concurrent patches each count
+            interaction.revision = cls.revision + 1
 
-            # Commit the changes
-            await db.commit()
-            await db.refresh(interaction)
+            # Stage the changes; the caller commits
+            await db.flush()
 
             return interaction
 
@@ -1,6 +1,9 @@
 from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, select, func, UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
+from datetime import datetime
+from app.core.auth_cache import revoked_tokens, user_cache
+from app.core.database import after_commit
 from . import Base
 
 
@@ -17,8 +20,12 @@ class BlackListToken(Base):
     async def create(cls, db: AsyncSession, **kwargs):
         token = cls(**kwargs)
         db.add(token)
-        await db.commit()
-        await db.refresh(token)
+        await db.flush()
+
+        def revoke():
+            revoked_tokens.add(token.id, token.expire)
+            user_cache.invalidate_token(token.id)
+        after_commit(db, revoke)
         return token
     
     @classmethod
@@ -27,6 +34,12 @@ class BlackListToken(Base):
         result = await db.execute(query)
         return result.scalars().first()
 
+    @classmethod
+    async def find_active(cls, db: AsyncSession):
+        query = select(cls.id, cls.expire).where(cls.expire > datetime.utcnow())
+        result = await db.execute(query)
+        return result.all()
+
     @classmethod
     async def patch(cls, db: AsyncSession, id: UUID, **kwargs):
         # Fetch the user from the database
@@ -38,6 +51,5 @@ class BlackListToken(Base):
         for key, value in kwargs.items():
             setattr(token, key, value)
 
-        await db.commit()
-        await db.refresh(token)
+        await db.flush()
         return token
\ No newline at end of file
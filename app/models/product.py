@@ -1,6 +1,8 @@
 # app/models/product.py
 from uuid import uuid4
-from sqlalchemy import Column, String, select, DateTime, Boolean, func, UUID, ForeignKey, Float, ARRAY
+from typing import Optional
+from sqlalchemy import Column, String, select, DateTime, Boolean, func, UUID, ForeignKey, Float, ARRAY, Index, any_, bindparam
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import Base
@@ -26,15 +28,49 @@ class Product(Base):
 
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     is_disabled = Column(Boolean, default=False)
+
+    __table_args__ = (
+        Index("ix_products_platform_country_asin", "platform", "country", "asin", unique=True),
+    )
         
     @classmethod
     async def create(cls, db: AsyncSession, **kwargs):
         new_product = cls(**kwargs)
         db.add(new_product)
-        await db.commit()
-        await db.refresh(new_product)
+        await db.flush()
         return new_product
         
+    @classmethod
+    async def bulk_upsert(cls, db: AsyncSession, products: list[dict], update_columns: Optional[list[str]] = None):
+        """
+        Inserts or updates many products with a single
+        INSERT ... ON CONFLICT (platform, country, asin) DO UPDATE ... RETURNING.
+        When the same key appears more than once the last row wins.
+        `update_columns` limits which columns overwrite an existing row
+        (defaults to every column given).
+
+        Returns the stored rows as dicts, in no particular order.
+        """
+        rows = {}
+        for product in products:
+            row = {"platform": "amazon", "country": "ae", **product}
+            rows[(row["platform"], row["country"], row["asin"])] = row
+        if not rows:
+            return []
+
+        columns = {key for row in rows.values() for key in row}
+        values = [{key: row.get(key) for key in columns} for row in rows.values()]
+        stmt = insert(cls).values(values)
+        if update_columns is None:
+            update_columns = [key for key in columns if key not in ("platform", "country", "asin")]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.platform, cls.country, cls.asin],
+            set_={key: stmt.excluded[key] for key in update_columns},
+        ).returning(*cls.__table__.columns)
+
+        result = await db.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
     @classmethod
     async def find_by_id(cls, db: AsyncSession, id: UUID):
         query = select(cls).where(cls.id == id)
@@ -42,15 +78,46 @@ class Product(Base):
         return result.scalars().first()
             
     @classmethod
-    async def find_by_asin(cls, db: AsyncSession, asin: str):
+    async def find_by_asin(cls, db: AsyncSession, asin: str, platform: Optional[str] = None, country: Optional[str] = None):
+        # Uses the (platform, country, asin) key when platform and country are known
         query = select(cls).where(cls.asin == asin)
+        if platform is not None:
+            query = query.where(cls.platform == platform)
+        if country is not None:
+            query = query.where(cls.country == country)
         result = await db.execute(query)
         return result.scalars().first()
+
+    @classmethod
+    async def find_many_by_asin(cls, db: AsyncSession, asins: list[str], platform: Optional[str] = None, country: Optional[str] = None):
+        """
+        Fetches many products in one `WHERE asin = ANY(:asins)` query.
+
+        Returns (products, missing): the products found in the requested
+        order, and the requested asins that have no stored product.
+        """
+        asins = list(dict.fromkeys(asins))
+        if not asins:
+            return [], []
+
+        query = select(cls).where(cls.asin == any_(bindparam("asins", asins, type_=ARRAY(String))))
+        if platform is not None:
+            query = query.where(cls.platform == platform)
+        if country is not None:
+            query = query.where(cls.country == country)
+        result = await db.execute(query)
+
+        products_by_asin = {}
+        for product in result.scalars():
+            products_by_asin.setdefault(product.asin, product)
+        products = [products_by_asin[asin] for asin in asins if asin in products_by_asin]
+        missing = [asin for asin in asins if asin not in products_by_asin]
+        return products, missing
     
     @classmethod
-    async def patch(cls, db: AsyncSession, asin: str, **kwargs):
+    async def patch(cls, db: AsyncSession, asin: str, platform: Optional[str] = None, country: Optional[str] = None, **kwargs):
         # Fetch the product from the database
-        product = await cls.find_by_asin(db, asin)
+        product = await cls.find_by_asin(db, asin, platform=platform, country=country)
         if product is None:
             return None
 
@@ -58,19 +125,17 @@ class Product(Base):
         for key, value in kwargs.items():
             setattr(product, key, value)
 
-        await db.commit()
-        await db.refresh(product)
+        await db.flush()
         return product
     
     @classmethod
-    async def delete(cls, db: AsyncSession, asin: str):
+    async def delete(cls, db: AsyncSession, asin: str, platform: Optional[str] = None, country: Optional[str] = None):
         # Fetch the user from the database
-        product = await cls.find_by_asin(db, asin)
+        product = await cls.find_by_asin(db, asin, platform=platform, country=country)
         if product is None:
             return None
 
         # Set is_disabled to True and update the database
         product.is_disabled = True
-        await db.commit()
-        await db.refresh(product)
+        await db.flush()
         return product
@@ -1,4 +1,5 @@
 # app/models/user.py
+import functools
 from uuid import uuid4
 from sqlalchemy import Column, String, select, DateTime, Boolean, func, UUID
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,6 +7,8 @@ from sqlalchemy.orm import relationship
 
 from . import Base
 from app.utils.hash import verify_password, hash_password
+from app.core.auth_cache import user_cache
+from app.core.database import after_commit
 
 
 class User(Base):
@@ -32,8 +35,7 @@ class User(Base):
         new_user = cls(**kwargs)
         new_user.password = hash_password(new_user.password)
         db.add(new_user)
-        await db.commit()
-        await db.refresh(new_user)
+        await db.flush()
         return new_user
         
     @classmethod
@@ -72,8 +74,8 @@ class User(Base):
         for key, value in kwargs.items():
             setattr(user, key, value)
 
-        await db.commit()
-        await db.refresh(user)
+        await db.flush()
+        after_commit(db, functools.partial(user_cache.invalidate_user, phone))
         return user
 
     @classmethod
@@ -85,8 +87,8 @@ class User(Base):
 
         # Set is_disabled to False and update the database
         user.is_disabled = False
-        await db.commit()
-        await db.refresh(user)
+        await db.flush()
+        after_commit(db, functools.partial(user_cache.invalidate_user, phone))
         return user
         
     @classmethod
@@ -98,6 +100,6 @@ class User(Base):
 
         # Set is_disabled to True and update the database
         user.is_disabled = True
-        await db.commit()
-        await db.refresh(user)
+        await db.flush()
+        after_commit(db, functools.partial(user_cache.invalidate_user, phone))
         return user
@@ -15,7 +15,7 @@ from app.utils.authUtils import (
     refresh_token_state,
     decode_access_token,
     add_refresh_token_cookie,
-    authenticateToken
+    CurrentUserDep
 )
 
 from app.schemas.user import (
@@ -87,20 +87,15 @@ async def register(
     )
     bg_task.add_task(user_mail_event, mail_task_data)
 
-    await Profile.create(db, user_id, [], [])
+    await Profile.create(db, user_id, [])
     return user_schema
 
 
 @router.get("/verify", response_model=SuccessResponseScheme)
 async def verify(
-    token: str,
+    user: CurrentUserDep,
     db: DBSessionDep
 ):
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
-
     await user.patch(db=db, phone=user.phone, is_disabled=False)
     return {"msg": "Successfully activated"}
 
@@ -188,15 +183,10 @@ async def password_reset_token(
 
 @router.post("/password-update", response_model=SuccessResponseScheme)
 async def password_update(
-    token: str,
+    user: CurrentUserDep,
     data: PasswordUpdateSchema,
     db: DBSessionDep,
 ):
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
-
     # Validate old password
     if not verify_password(data.old_password, user.password):
         return {"msg": "Old Password Error"}
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from sse_starlette import EventSourceResponse
 from typing import Any
 from datetime import datetime
 import uuid
@@ -7,9 +8,9 @@ from app.models import Interaction, Chatsession
 from app.core.database import DBSessionDep
 from app.core.exceptions import NotFoundException
 from app.utils.appUtils import formatAppHistory, formatAppReply
-from app.utils.authUtils import authenticateToken
+from app.utils.authUtils import authenticateToken, CurrentUserDep
 from app.agents.chatAgent.chains_copy import newMesssageChain, nextNoonSearch, nextTopPicks
-from app.agents.chatAgent.search_agent import MessageChain
+from app.agents.chatAgent.search_agent import MessageChain, MessageChainStream
 from app.agents.chatAgent.tools import available_tools
 from app.schemas.chat_requests import ChatRequest
 from app.schemas.chat_session import NewSessionRequest
@@ -24,14 +25,14 @@ router = APIRouter(
 
 @router.get("/get_sessions", response_model=Any)
 async def get_sessions(
-    token: str,
+    user: CurrentUserDep,
     db: DBSessionDep
 ):
     """
     Fetches all chat sessions for the authenticated user.
 
     Args:
-        token: The JWT token for user authentication.
+        user: The user authenticated from the `token` query parameter.
         db: DBSessionDep for database operations.
 
     Returns:
@@ -40,13 +41,6 @@ async def get_sessions(
     try:
         logger.info("Received request to fetch chat sessions.")
 
-        # JWT Authentication
-        logger.debug("Authenticating user token.")
-        user = await authenticateToken(db=db, token=token)
-        if not user:
-            logger.warning(f"Authentication failed for token: {token}")
-            raise NotFoundException(detail="User not found")
-        
         user_id = user.id
         logger.info(f"User authenticated successfully: user_id={user_id}")
 
@@ -168,9 +162,41 @@ async def chat_response(
         logger.error(f"Unexpected error in chat_response: {e}", exc_info=True)
         raise  
 
+@router.post("/new_message/stream")
+async def chat_response_stream(
+    request: ChatRequest,
+    db: DBSessionDep
+):
+    """
+    Streaming variant of `/new_message` over server-sent events.
+
+    Emits `token` events with assistant text as it is generated,
+    `amazonProducts` / `noonProducts` events with product cards as soon as
+    each marketplace returns, then a `done` event. Every event's data
+    carries the turn's `interactionId`, as in the `/new_message` response.
+
+    Args:
+        request: ChatRequest containing session_id, token, and user message.
+        db: DBSessionDep for database operations.
+
+    Returns:
+        An EventSourceResponse streaming the chat reply.
+    """
+    logger.info(f"Received streaming chat request for session_id: {request.session_id}")
+
+    # JWT Authentication
+    logger.debug("Authenticating user token.")
+    user = await authenticateToken(db=db, token=request.token)
+    if not user:
+        logger.warning(f"Authentication failed for token: {request.token}")
+        raise NotFoundException(detail="User not found")
+
+    logger.info(f"User authenticated successfully: {user.id}")
+    return EventSourceResponse(MessageChainStream(request.session_id, request.message))
+
 @router.get("/next_message", response_model=dict)
 async def chat_next(
-    token: str,
+    user: CurrentUserDep,
     interaction_id: str,
     db: DBSessionDep
 ):
@@ -178,7 +204,7 @@ async def chat_next(
     Handles the 'next' interaction flow for a chat session.
 
     Args:
-        token: The JWT token for user authentication.
+        user: The user authenticated from the `token` query parameter.
         interaction_id: The ID of the interaction to process the next step.
         db: DBSessionDep for database operations.
 
@@ -188,13 +214,6 @@ async def chat_next(
     try:
         logger.info(f"Received chat_next request for interaction_id: {interaction_id}")
 
-        # JWT Authentication
-        logger.debug("Authenticating user token.")
-        user = await authenticateToken(db=db, token=token)
-        if not user:
-            logger.warning(f"Authentication failed for token: {token}")
-            raise NotFoundException(detail="User not found")
-        
         user_id = user.id
         country = user.country
         logger.info(f"User authenticated successfully: user_id={user_id}, country={country}")
@@ -248,7 +267,7 @@ async def chat_next(
 
 @router.get("/history", response_model=dict)
 async def chat_history(
-    token: str,
+    user: CurrentUserDep,
     session_id: str,
     db: DBSessionDep
 ):
@@ -256,7 +275,7 @@ async def chat_history(
     Fetches the chat history for a given session.
 
     Args:
-        token: The JWT token for user authentication.
+        user: The user authenticated from the `token` query parameter.
         session_id: The ID of the chat session.
         db: DBSessionDep for database operations.
 
@@ -266,13 +285,6 @@ async def chat_history(
     try:
         logger.info(f"Received chat_history request for session_id: {session_id}")
 
-        # JWT Authentication
-        logger.debug("Authenticating user token.")
-        user = await authenticateToken(db=db, token=token)
-        if not user:
-            logger.warning(f"Authentication failed for token: {token}")
-            raise NotFoundException(detail="User not found")
-        
         user_id = user.id
         first_name = user.first_name
         logger.info(f"User authenticated successfully: user_id={user_id}, first_name={first_name}")
@@ -6,7 +6,7 @@ from app.models import Checkout
 from app.core.database import DBSessionDep
 from app.core.exceptions import NotFoundException
 
-from app.utils.authUtils import authenticateToken
+from app.utils.authUtils import CurrentUserDep
 
 
 router = APIRouter(
@@ -16,14 +16,10 @@ router = APIRouter(
 )
 @router.post("/cart", response_model=dict)
 async def cart_link(
-    token: str,
+    user: CurrentUserDep,
     products: List[dict],
     db: DBSessionDep
 ):
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
     
     user_id = user.id
     country = user.country
@@ -52,14 +48,10 @@ async def cart_link(
 
 @router.post("/product", response_model=dict)
 async def product_link(
-    token: str,
+    user: CurrentUserDep,
     product: dict,
     db: DBSessionDep
 ):
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
     user_id = user.id
     
     country = user.country
@@ -82,13 +74,9 @@ async def product_link(
 
 @router.get("/history", response_model=dict)
 async def checkout_history(
-    token: str,
+    user: CurrentUserDep,
     db: DBSessionDep
 ):
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
     user_id = user.id
 
     history = await Checkout.find_by_user_id(db, user_id)
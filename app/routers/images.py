@@ -1,9 +1,13 @@
 # app/routers/image.py
-from fastapi import APIRouter, Path, HTTPException, Depends
-from fastapi.responses import StreamingResponse
-import httpx
-from app.core.database import DBSessionDep
-from app.utils.authUtils import authenticateToken
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.core.config import settings
+from app.utils.image_proxy import (
+    image_proxy, CachedImage, ImageFetchError, PRIORITIES, cache_headers, etag_matches, variant_width,
+)
 
 router = APIRouter(
     prefix="/image",
@@ -14,16 +18,45 @@ router = APIRouter(
 @router.get("/{image_url:path}", response_class=StreamingResponse)
 async def fetch_image(
     image_url: str,
-    db: DBSessionDep
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, description="Target width in pixels, rounded up to a cached size"),
+    q: Optional[int] = Query(None, ge=30, le=95, description="Encoding quality"),
+    format: Optional[Literal["webp", "jpeg"]] = Query(None, description="Defaults to WebP when the client accepts it"),
+    priority: Literal["visible", "prefetch"] = Query("visible", description="Prefetches wait behind on-screen images"),
 ):
-    try:
-        # Fetch the image from the CDN
-        async with httpx.AsyncClient() as client:
-            response = await client.get(image_url)
-            response.raise_for_status()
+    resize = w is not None or q is not None or format is not None
+    if resize and format is None:
+        format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+
+    # A cache hit can be evicted by a concurrent request before it is read; look it up again once
+    for _ in range(2):
+        try:
+            if resize:
+                image = await image_proxy.variant(
+                    image_url,
+                    variant_width(w or max(settings.image_widths)),
+                    q or settings.image_default_quality,
+                    format,
+                    PRIORITIES[priority],
+                )
+            else:
+                image = await image_proxy.fetch(image_url, priority=PRIORITIES[priority])
+        except ImageFetchError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+        if not isinstance(image, CachedImage):
+            break
+        headers = cache_headers(image)
+        if resize and "format" not in request.query_params:
+            headers["Vary"] = "Accept"
+        if etag_matches(request.headers.get("if-none-match"), image.etag):
+            return Response(status_code=304, headers=headers)
+        # Read whole (images are size-capped) so eviction cannot remove the file mid-response
+        body = await image_proxy.cache.read(image)
+        if body is not None:
+            return Response(content=body, media_type=image.content_type, headers=headers)
+    else:
+        raise HTTPException(status_code=503, detail="Image evicted while serving, try again")
 
-        # Return the image as a streaming response
-        return StreamingResponse(response.aiter_bytes(), media_type=response.headers.get("content-type"))
-    
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=response.status_code, detail=f"Error fetching image: {str(e)}")
+    # First request for this image: relay the upstream body as it arrives
+    return StreamingResponse(image.chunks, media_type=image.content_type, headers=cache_headers())
@@ -0,0 +1,48 @@
+# app/routers/metrics.py
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.core.config import settings
+from app.core.exceptions import AuthFailedException, NotFoundException
+from app.core.timing import stage_summaries
+from app.core.metrics import render
+from app.core.database import sessionmanager
+
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer)):
+    # Pool stats, route latencies and stage names are internal; hidden unless a token is configured
+    if not settings.metrics_token:
+        raise NotFoundException()
+    if credentials is None or not secrets.compare_digest(credentials.credentials, settings.metrics_token):
+        raise AuthFailedException()
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(require_metrics_token)],
+)
+
+
+@router.get("")
+async def get_metrics():
+    # Prometheus text exposition format
+    body, content_type = render()
+    return Response(content=body, media_type=content_type)
+
+
+@router.get("/stages", response_model=dict)
+async def get_stage_timings():
+    # Rolling latency percentiles (seconds) per request stage
+    return stage_summaries()
+
+
+@router.get("/db", response_model=dict)
+async def get_db_pool_stats():
+    return sessionmanager.pool_stats()
@@ -7,7 +7,7 @@ from app.schemas.profile import ProfileCreate, ProfileBase, ProfileUpdate
 from app.core.database import DBSessionDep
 from app.core.exceptions import NotFoundException
 
-from app.utils.authUtils import authenticateToken
+from app.utils.authUtils import CurrentUserDep
 
 
 router = APIRouter(
@@ -17,12 +17,8 @@ router = APIRouter(
 )
 
 @router.get("", response_model=dict)
-async def get_profile(token: str, db: DBSessionDep):
+async def get_profile(user: CurrentUserDep, db: DBSessionDep):
     
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
     user_id = user.id
 
     response = {
@@ -50,13 +46,9 @@ async def get_profile(token: str, db: DBSessionDep):
 
 @router.get("/onboarded", response_model=Any)
 async def is_onboarded(
-    token: str,
+    user: CurrentUserDep,
     db: DBSessionDep
 ):
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
     user_id = user.id
     profile = await Profile.find_by_user_id(db=db, user_id=user_id)
     onboarded = profile.is_onboarded
@@ -65,14 +57,10 @@ async def is_onboarded(
 
 @router.post("/onboard", response_model=Any)
 async def onboard(
-    token: str,
+    user: CurrentUserDep,
     fav_categories: List[str],
     db: DBSessionDep
 ):
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
     user_id = user.id
     profile = await Profile.find_by_user_id(db=db, user_id=user_id)
     await profile.update_fav_categories(db, user_id, fav_categories)
@@ -83,16 +71,12 @@ async def onboard(
 @router.post("/upsert", response_model=Any)
 async def upsert_profile(
     profile_data: ProfileCreate,  # Use ProfileCreate for incoming data
-    token: str,
+    user: CurrentUserDep,
     db: DBSessionDep
 ):
     # Log the incoming data
     print("Received profile_data:", profile_data.dict())
     
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
     user_id = user.id
 
     # Check if profile exists
@@ -131,13 +115,9 @@ async def upsert_profile(
 
 @router.get("/usage", response_model=Any)
 async def get_usage(
-    token: str,
+    user: CurrentUserDep,
     db: DBSessionDep
 ):
-    # JWT Authentication
-    user = await authenticateToken(db=db, token=token)
-    if not user:
-        raise NotFoundException(detail="User not found")
     user_id = user.id
     chat_sessions = await Chatsession.find_by_user_id(db=db, user_id=user_id)
     _prompt_tokens = 0
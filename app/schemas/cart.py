@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+
+# Reference to a stored product by its (platform, country, asin) key.
+# All three are required, as an asin is only unique within a platform and country.
+# Extra fields are ignored, so full product dicts are accepted as well.
+class ProductRef(BaseModel):
+    platform: str
+    country: str
+    asin: str
+    quantity: int = Field(default=1, ge=1)
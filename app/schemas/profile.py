@@ -4,10 +4,9 @@ from pydantic import BaseModel
 from datetime import datetime
 
 # Base schema for common fields between create and update operations
+# (cart and wishlist items are managed through /cart and /wishlist)
 class ProfileBase(BaseModel):
     fav_categories: Optional[List[str]] = None
-    cart: Optional[List[dict]] = None
-    wishlist: Optional[List[dict]] = None
 
 # Schema for reading a profile (i.e., the complete Profile model)
 class Profile(ProfileBase):
@@ -26,6 +25,4 @@ class ProfileCreate(ProfileBase):
 # Schema for updating an existing profile
 class ProfileUpdate(BaseModel):
     fav_categories: Optional[List[str]] = None
-    cart: Optional[List[dict]] = None
-    wishlist: Optional[List[dict]] = None
     is_deleted: Optional[bool] = None
@@ -58,41 +58,30 @@ async def formatAppHistory(interactions: List[Interaction]) -> Dict:
             
     return {'messages': messages}
 
+def formatAppFrame(frame_type: str, interaction_id, **fields) -> Dict:
+    """
+    Builds a single assistant message frame as rendered by the app
+    (`text`, `amazonProducts`, `noonProducts`).
+    """
+    return {
+        "type": frame_type,
+        "id": uuid.uuid4(),
+        "interaction_id": interaction_id,
+        "role": "assistant",
+        "createdAt": int(datetime.now().timestamp() * 1000),
+        **fields,
+    }
+
 async def formatAppReply(response: dict):
     messages = []
 
     if response['amazonProducts']:
-        products = {
-                    "type": "amazonProducts",
-                    "id": uuid.uuid4(),
-                    "interaction_id": response['interactionId'],
-                    "role": "assistant",
-                    "createdAt": int(datetime.now().timestamp() * 1000),
-                    "products": response['amazonProducts'],
-                }
-        messages.append(products)
+        messages.append(formatAppFrame("amazonProducts", response['interactionId'], products=response['amazonProducts']))
 
     if response['noonProducts']:
-        products = {
-                    "type": "noonProducts",
-                    "id": uuid.uuid4(),
-                    "interaction_id": response['interactionId'],
-                    "role": "assistant",
-                    "createdAt": int(datetime.now().timestamp() * 1000),
-                    "products": response['noonProducts'],
-                }
-        messages.append(products)
-    
+        messages.append(formatAppFrame("noonProducts", response['interactionId'], products=response['noonProducts']))
+
     if response['message']:
-        message = {
-            "type": "text",
-            "id": uuid.uuid4(),
-            "interaction_id": response['interactionId'],
-            "role": "assistant",
-            "createdAt": int(datetime.now().timestamp() * 1000),
-            "text": response['message']
-        }
-        messages.append(message)
-        
-    return messages
+        messages.append(formatAppFrame("text", response['interactionId'], text=response['message']))
 
+    return messages
@@ -2,9 +2,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import User
 from datetime import datetime, timedelta, timezone
+from typing import Annotated
 import uuid
+import time
 
-from fastapi import Response
+from fastapi import Response, Depends
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
@@ -12,7 +14,9 @@ from app.models import User
 from app.models import BlackListToken
 from app.schemas.jwt import JwtTokenSchema, TokenPair
 from app.schemas.mail import MailTaskSchema
-from app.core.exceptions import AuthFailedException
+from app.core.exceptions import AuthFailedException, NotFoundException
+from app.core.database import DBSessionDep
+from app.core.auth_cache import revoked_tokens, user_cache
 from app.core.config import (
     ACCESS_TOKEN_EXPIRES_MINUTES,
     SECRET_KEY,
@@ -61,11 +65,19 @@ def create_token_pair(user: User) -> TokenPair:
     )
 
 
+async def refresh_revoked_tokens(db: AsyncSession):
+    # Reload the in-memory blacklist at most once per refresh interval
+    if revoked_tokens.needs_refresh():
+        started_at = time.monotonic()
+        tokens = await BlackListToken.find_active(db=db)
+        revoked_tokens.replace(tokens, started_at)
+
+
 async def decode_access_token(token: str, db: AsyncSession):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        black_list_token = await BlackListToken.find_by_id(db=db, id=payload[JTI])
-        if black_list_token:
+        await refresh_revoked_tokens(db)
+        if revoked_tokens.is_revoked(payload[JTI]):
             raise JWTError("Token is blacklisted")
     except JWTError:
         raise AuthFailedException()
@@ -102,5 +114,29 @@ async def authenticateToken(
         token: str
 ):
     payload = await decode_access_token(db=db, token=token)
-    user = await User.find_by_phone(db=db, phone=payload['sub'])
-    return user
\ No newline at end of file
+
+    # Serve the user row from the per-token cache when possible
+    cached_user = user_cache.get(payload[JTI])
+    if cached_user is None:
+        user = await User.find_by_phone(db=db, phone=payload['sub'])
+        if user is None:
+            return None
+        db.expunge(user)
+        user_cache.set(payload[JTI], user)
+        cached_user = user
+
+    # Attach a copy to this request's session without querying
+    return await db.merge(cached_user, load=False)
+
+
+async def get_current_user(token: str, db: DBSessionDep) -> User:
+    """
+    FastAPI dependency resolving the `token` query parameter to its `User`.
+    """
+    user = await authenticateToken(db=db, token=token)
+    if not user:
+        raise NotFoundException(detail="User not found")
+    return user
+
+
+CurrentUserDep = Annotated[User, Depends(get_current_user)]
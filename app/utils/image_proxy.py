@@ -0,0 +1,500 @@
+"""
+Caching proxy for marketplace product images.
+
+Upstream images are fetched through the pooled `imageclient` and relayed
+to the first requester chunk by chunk while they are written to a
+content-addressed disk cache. Concurrent requests for the same URL wait
+for that single download and are served from the cache once it lands.
+
+Resized WebP/JPEG variants are rendered from the cached original in the
+worker process pool and cached alongside it, keyed by URL and parameters.
+
+Only allowlisted marketplace CDNs are fetched, bodies are size-capped, and
+downloads and renders wait in priority queues so that images on screen are
+served before prefetches.
+"""
+import os
+import json
+import uuid
+import asyncio
+import hashlib
+import bisect
+import contextlib
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import AsyncIterator, Optional, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.core.http import HttpClientManager, imageclient
+from app.core.priority import PriorityLimiter, Ticket
+from app.core.singleflight import SingleFlight
+from app.core.workers import process_pool
+from app.logs.logger import logger
+from app.utils.image_resize import resize_image
+
+CHUNK_SIZE = 64 * 1024
+
+# Request priorities, most urgent first
+PRIORITIES = {"visible": 0, "prefetch": 1}
+
+
+class ImageFetchError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class CachedImage:
+    digest: str
+    content_type: str
+    size: int
+    path: str = ""
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest[:32]}"'
+
+
+@dataclass
+class ImageStream:
+    content_type: str
+    chunks: AsyncIterator[bytes]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def check_url(url: str):
+    """
+    Refuses anything but http(s) URLs on an allowlisted host, so the proxy
+    cannot be pointed at internal services or used as an open relay.
+    """
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        raise ImageFetchError(400, "Invalid image URL")
+    if parts.scheme not in ("http", "https") or parts.username or parts.password:
+        raise ImageFetchError(400, "Invalid image URL")
+    for pattern in settings.image_allowed_hosts:
+        if host == pattern or (pattern.startswith("*.") and host.endswith(pattern[1:])):
+            return
+    raise ImageFetchError(403, "Image host not allowed")
+
+
+def variant_width(width: int) -> int:
+    """
+    Rounds a requested width up to the nearest configured size, so clients
+    asking for slightly different widths share one cached variant.
+    """
+    widths = sorted(settings.image_widths)
+    return widths[min(bisect.bisect_left(widths, width), len(widths) - 1)]
+
+
+def cache_headers(image: Optional[CachedImage] = None) -> dict:
+    headers = {"Cache-Control": f"public, max-age={settings.image_cache_max_age}"}
+    if image is not None:
+        headers["ETag"] = image.etag
+    return headers
+
+
+class CacheWriter:
+    """
+    Spools one download to a temporary file, hashing it on the way.
+    """
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, f"{uuid.uuid4().hex}.part")
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = None
+
+    async def write(self, chunk: bytes):
+        if self._file is None:
+            self._file = await asyncio.to_thread(open, self.path, "wb")
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        await asyncio.to_thread(self._file.write, chunk)
+
+    async def close(self) -> str:
+        if self._file is None:
+            self._file = await asyncio.to_thread(open, self.path, "wb")
+        await asyncio.to_thread(self._file.close)
+        return self._hash.hexdigest()
+
+    async def abort(self):
+        await self.close()
+        try:
+            await asyncio.to_thread(os.remove, self.path)
+        except FileNotFoundError:
+            pass
+
+
+class ImageDiskCache:
+    """
+    Content-addressed image store with size-based LRU eviction.
+
+    Bodies are stored once per SHA-256 digest under `objects/`, and
+    `index/` maps each cache key (a hash of the source URL) to its digest
+    and content type. The LRU order is rebuilt from the index files'
+    mtimes on first use and refreshed on every hit; the least recently
+    used entries are evicted once the stored bytes exceed `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedImage] = OrderedDict()
+        self._refs: dict[str, int] = {}
+        self._size = 0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def key(source: str) -> str:
+        return hashlib.sha256(source.encode()).hexdigest()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _index_path(self, key: str) -> str:
+        return os.path.join(self.directory, "index", f"{key}.json")
+
+    def _load(self) -> list:
+        for name in ("objects", "index", "tmp"):
+            os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+        entries = []
+        index_dir = os.path.join(self.directory, "index")
+        for name in os.listdir(index_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(index_dir, name)
+            try:
+                with open(path) as f:
+                    image = CachedImage(**json.load(f))
+                mtime = os.stat(path).st_mtime
+            except (OSError, ValueError, TypeError):
+                continue
+            image.path = self._object_path(image.digest)
+            if os.path.exists(image.path):
+                entries.append((mtime, name.removesuffix(".json"), image))
+        entries.sort(key=lambda entry: entry[0])
+        return [(key, image) for _, key, image in entries]
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                for key, image in await asyncio.to_thread(self._load):
+                    self._add(key, image)
+                self._loaded = True
+                logger.info(f"Image cache loaded: {len(self._entries)} entries, {self._size} bytes")
+
+    def _add(self, key: str, image: CachedImage):
+        self._drop(key)
+        self._entries[key] = image
+        if not self._refs.get(image.digest):
+            self._size += image.size
+        self._refs[image.digest] = self._refs.get(image.digest, 0) + 1
+
+    def _drop(self, key: str) -> Optional[CachedImage]:
+        """
+        Forgets `key`; returns its image if no other key shares the body.
+        """
+        image = self._entries.pop(key, None)
+        if image is None:
+            return None
+        self._refs[image.digest] -= 1
+        if self._refs[image.digest]:
+            return None
+        del self._refs[image.digest]
+        self._size -= image.size
+        return image
+
+    async def get(self, source: str) -> Optional[CachedImage]:
+        await self._ensure_loaded()
+        key = self.key(source)
+        image = self._entries.get(key)
+        if image is None:
+            return None
+        self._entries.move_to_end(key)
+        try:
+            await asyncio.to_thread(os.utime, self._index_path(key))
+        except FileNotFoundError:
+            # Evicted by another worker process sharing the directory
+            self._drop(key)
+            return None
+        return image
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    async def read(self, image: CachedImage) -> Optional[bytes]:
+        """
+        Returns the stored body, or None if it was evicted since the lookup.
+        """
+        try:
+            return await asyncio.to_thread(self._read, image.path)
+        except FileNotFoundError:
+            # Possibly by another worker process; forget it so the next lookup misses
+            for key in [key for key, entry in self._entries.items() if entry.digest == image.digest]:
+                self._drop(key)
+            return None
+
+    def writer(self) -> CacheWriter:
+        return CacheWriter(os.path.join(self.directory, "tmp"))
+
+    def _store(self, key: str, writer: CacheWriter, image: CachedImage):
+        if os.path.exists(image.path):
+            os.remove(writer.path)
+        else:
+            os.makedirs(os.path.dirname(image.path), exist_ok=True)
+            os.replace(writer.path, image.path)
+        index_path = self._index_path(key)
+        with open(f"{index_path}.part", "w") as f:
+            json.dump({k: v for k, v in asdict(image).items() if k != "path"}, f)
+        os.replace(f"{index_path}.part", index_path)
+
+    def _remove(self, keys: list, images: list):
+        for key in keys:
+            try:
+                os.remove(self._index_path(key))
+            except FileNotFoundError:
+                pass
+        for image in images:
+            try:
+                os.remove(image.path)
+            except FileNotFoundError:
+                pass
+
+    async def put(self, source: str, writer: CacheWriter, content_type: str) -> CachedImage:
+        await self._ensure_loaded()
+        digest = await writer.close()
+        image = CachedImage(digest, content_type, writer.size, self._object_path(digest))
+        key = self.key(source)
+        await asyncio.to_thread(self._store, key, writer, image)
+        self._add(key, image)
+
+        evicted_keys, evicted_images = [], []
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            evicted_keys.append(oldest)
+            unused = self._drop(oldest)
+            if unused is not None:
+                evicted_images.append(unused)
+        if evicted_keys:
+            await asyncio.to_thread(self._remove, evicted_keys, evicted_images)
+        return image
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+class _Download:
+    def __init__(self, queue: PriorityLimiter, ticket: Ticket, relaying: bool = True):
+        loop = asyncio.get_running_loop()
+        self.started = loop.create_future()   # content type, once upstream answered
+        self.finished = loop.create_future()  # CachedImage, once stored
+        self.chunks: asyncio.Queue = asyncio.Queue()
+        self.queue = queue
+        self.ticket = ticket
+        self.relaying = relaying
+        for future in (self.started, self.finished):
+            # Nobody may be left waiting when a download fails
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+
+class ImageProxy:
+    """
+    Serves images from the disk cache, fetching misses once per URL.
+
+    `fetch` returns a `CachedImage` for a cache hit (or when another
+    request's download of the same URL completes) and an `ImageStream` to
+    the request that started the download, unless `relay` is False.
+    Downloads run in their own task, so the cache is filled even if that
+    client disconnects.
+
+    `variant` serves resized copies, rendering each (url, width, quality,
+    format) once and caching it like any other image.
+
+    Downloads and renders take a slot from a `PriorityLimiter` first.
+    Downloads queue per upstream host, since nearly every image comes from
+    one CDN and a shared FIFO cap would let earlier prefetches hold it. A
+    download or render already queued is promoted when a more urgent request
+    joins it, and new prefetches are refused while their host's queue is full.
+    """
+
+    def __init__(self, cache: ImageDiskCache, client: HttpClientManager):
+        self.cache = cache
+        self.client = client
+        self._downloads: dict[str, _Download] = {}
+        self._renders = SingleFlight(timeout=settings.image_resize_timeout)
+        self._render_tickets: dict[str, Ticket] = {}
+        self.download_queues: dict[str, PriorityLimiter] = {}
+        self.render_queue = PriorityLimiter(max(settings.worker_processes, 1))
+
+    def _download_queue(self, url: str) -> PriorityLimiter:
+        host = urlsplit(url).netloc
+        queue = self.download_queues.get(host)
+        if queue is None:
+            queue = PriorityLimiter(settings.image_max_connections_per_host)
+            self.download_queues[host] = queue
+        return queue
+
+    async def fetch(self, url: str, relay: bool = True, priority: int = 0) -> Union[CachedImage, ImageStream]:
+        check_url(url)
+        image = await self.cache.get(url)
+        if image is not None:
+            return image
+
+        download = self._downloads.get(url)
+        if download is not None:
+            download.queue.promote(download.ticket, priority)
+            return await asyncio.shield(download.finished)
+
+        queue = self._download_queue(url)
+        # Counted from the registered downloads: new ones have not reached the queue yet
+        queued = sum(1 for other in self._downloads.values() if other.queue is queue) - queue.limit
+        if priority > 0 and queued >= settings.image_fetch_queue_size:
+            raise ImageFetchError(503, "Image proxy busy")
+        download = self._downloads[url] = _Download(queue, queue.ticket(priority), relaying=relay)
+        asyncio.create_task(self._download(url, download))
+        if not relay:
+            return await asyncio.shield(download.finished)
+        content_type = await asyncio.shield(download.started)
+        return ImageStream(content_type, self._relay(download))
+
+    async def variant(self, url: str, width: int, quality: int, format: str, priority: int = 0) -> CachedImage:
+        check_url(url)
+        source = f"{url}#w={width}&q={quality}&f={format}"
+        image = await self.cache.get(source)
+        if image is not None:
+            return image
+
+        ticket = self._render_tickets.get(source)
+        if ticket is not None:
+            # Joining a render in flight, along with the download it may still wait on
+            self.render_queue.promote(ticket, priority)
+            download = self._downloads.get(url)
+            if download is not None:
+                download.queue.promote(download.ticket, priority)
+        else:
+            ticket = self._render_tickets[source] = self.render_queue.ticket(priority)
+        try:
+            return await self._renders.do(source, self._render, url, source, width, quality, format, ticket)
+        except asyncio.TimeoutError:
+            raise ImageFetchError(504, "Timed out resizing image")
+
+    async def _render(
+        self, url: str, source: str, width: int, quality: int, format: str, ticket: Ticket
+    ) -> CachedImage:
+        try:
+            original = await self.fetch(url, relay=False, priority=ticket.priority)
+            await self.render_queue.acquire(ticket)
+            try:
+                data = await process_pool.run(resize_image, original.path, width, quality, format)
+            except OSError as e:
+                # Not a decodable image, or the original was evicted meanwhile
+                logger.warning(f"Image resize failed for {url}: {e!r}")
+                raise ImageFetchError(415, "Unsupported image")
+            finally:
+                self.render_queue.release()
+        finally:
+            if self._render_tickets.get(source) is ticket:
+                del self._render_tickets[source]
+        writer = self.cache.writer()
+        try:
+            await writer.write(data)
+        except BaseException:
+            await writer.abort()
+            raise
+        return await self.cache.put(source, writer, f"image/{format}")
+
+    @contextlib.asynccontextmanager
+    async def _open(self, url: str) -> AsyncIterator[httpx.Response]:
+        """
+        Streams `url`, following redirects only to allowlisted hosts.
+        """
+        for _ in range(settings.image_max_redirects + 1):
+            async with self.client.stream("GET", url, follow_redirects=False) as response:
+                if not response.is_redirect:
+                    yield response
+                    return
+                url = str(response.next_request.url)
+                check_url(url)
+        raise ImageFetchError(502, "Too many redirects")
+
+    async def _download(self, url: str, download: _Download):
+        try:
+            await download.queue.acquire(download.ticket)
+            try:
+                async with self._open(url) as response:
+                    if response.status_code != 200:
+                        raise ImageFetchError(response.status_code, f"Upstream returned {response.status_code}")
+                    content_type = response.headers.get("content-type", "application/octet-stream")
+                    if not content_type.startswith("image/"):
+                        raise ImageFetchError(415, "Upstream response is not an image")
+                    length = response.headers.get("content-length", "")
+                    if length.isdigit() and int(length) > settings.image_max_body_bytes:
+                        raise ImageFetchError(502, "Upstream image too large")
+                    download.started.set_result(content_type)
+
+                    writer = self.cache.writer()
+                    try:
+                        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                            if writer.size + len(chunk) > settings.image_max_body_bytes:
+                                raise ImageFetchError(502, "Upstream image too large")
+                            await writer.write(chunk)
+                            if download.relaying:
+                                download.chunks.put_nowait(chunk)
+                    except BaseException:
+                        await writer.abort()
+                        raise
+            finally:
+                download.queue.release()
+            # The relayed body is complete even if storing it fails below
+            download.chunks.put_nowait(None)
+
+            download.finished.set_result(await self.cache.put(url, writer, content_type))
+        except Exception as e:
+            if not isinstance(e, ImageFetchError):
+                logger.warning(f"Image download failed for {url}: {e!r}")
+                e = ImageFetchError(502, "Error fetching image")
+            for future in (download.started, download.finished):
+                if not future.done():
+                    future.set_exception(e)
+            download.chunks.put_nowait(e)
+        finally:
+            download.chunks.put_nowait(None)
+            if self._downloads.get(url) is download:
+                del self._downloads[url]
+
+    @staticmethod
+    async def _relay(download: _Download) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await download.chunks.get()
+                if chunk is None:
+                    return
+                if isinstance(chunk, Exception):
+                    # Cut the response short; the client sees a truncated body
+                    raise chunk
+                yield chunk
+        finally:
+            download.relaying = False
+
+
+image_cache = ImageDiskCache(settings.image_cache_dir, settings.image_cache_max_bytes)
+image_proxy = ImageProxy(image_cache, imageclient)
@@ -0,0 +1,28 @@
+import io
+
+from PIL import Image
+
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+
+def resize_image(path: str, width: int, quality: int, format: str) -> bytes:
+    """
+    Scales the image at `path` down to `width` pixels wide (never up),
+    keeping its aspect ratio, and encodes it as WebP or JPEG.
+
+    CPU bound; async callers run it in `app.core.workers.process_pool`.
+    """
+    with Image.open(path) as image:
+        # thumbnail() lets the JPEG decoder downscale while decoding
+        image.thumbnail((width, image.height), Image.LANCZOS)
+        if format == "jpeg" and image.mode != "RGB":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+        out = io.BytesIO()
+        if format == "jpeg":
+            image.save(out, FORMATS[format], quality=quality, optimize=True, progressive=True)
+        else:
+            image.save(out, FORMATS[format], quality=quality, method=4)
+        return out.getvalue()
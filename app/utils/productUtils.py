@@ -4,8 +4,22 @@ from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 import requests
 import json
-from app.models import Product, Profile
+from app.models import Product, CartItem
 from app.utils.amazon_localization import localization
+from app.logs.logger import logger
+
+
+LISTING_COLUMNS = ["name", "price_symbol", "price", "rating"]
+
+
+def format_saved_product(product: dict):
+    return {
+        "asin": product["asin"],
+        "name": product["name"],
+        "currency": product["price_symbol"],
+        "price": product["price"],
+        "rating": product["rating"]
+    }
 
 
 async def create_and_format_top_n(db: AsyncSession, products: List, country: str, n: int = 10):
@@ -24,28 +38,11 @@ async def create_and_format_top_n(db: AsyncSession, products: List, country: str
             "price": product.get("price", 0),
             "rating": product.get("stars", 2.5)
         }
+        results.append(result)
 
-        saved_product = await Product.find_by_asin(db, product["asin"])
-        if not saved_product:
-            new_product = await Product.create(db=db, **result)
-            product_dict = {
-                "asin": new_product.asin,
-                "name": new_product.name,
-                "currency": new_product.price_symbol,
-                "price": new_product.price,
-                "rating": new_product.rating
-            }
-            results.append(product_dict)
-        else:
-            product_dict = {
-                "asin": saved_product.asin,
-                "name": saved_product.name,
-                "currency": saved_product.price_symbol,
-                "price": saved_product.price,
-                "rating": saved_product.rating
-            }
-            results.append(product_dict)
-    return results
+    saved_products = await Product.bulk_upsert(db, results, update_columns=LISTING_COLUMNS)
+    saved_by_asin = {product["asin"]: product for product in saved_products}
+    return [format_saved_product(saved_by_asin[result["asin"]]) for result in results]
 
 
 async def create_and_format_top_amazon(db: AsyncSession, products: List, country: str):
@@ -55,38 +52,20 @@ async def create_and_format_top_amazon(db: AsyncSession, products: List, country
             "country": country,
             "asin": product['asin'],
             "name": product['name'],
-            "image": product['image'],
+            "images": [product['image']],
             "price_symbol": product.get("price_symbol", "$"),
             "price": product.get("price", 0),
             "rating": product.get("rating", 3.2)
         }
+        results.append(result)
 
-        saved_product = await Product.find_by_asin(db, product["asin"])
-        if not saved_product:
-            new_product = await Product.create(db=db, **result)
-            product_dict = {
-                "asin": new_product.asin,
-                "name": new_product.name,
-                "currency": new_product.price_symbol,
-                "price": new_product.price,
-                "rating": new_product.rating
-            }
-            results.append(product_dict)
-        else:
-            product_dict = {
-                "asin": saved_product.asin,
-                "name": saved_product.name,
-                "currency": saved_product.price_symbol,
-                "price": saved_product.price,
-                "rating": saved_product.rating
-            }
-            results.append(product_dict)
-    return results
+    saved_products = await Product.bulk_upsert(db, results, update_columns=LISTING_COLUMNS)
+    saved_by_asin = {product["asin"]: product for product in saved_products}
+    return [format_saved_product(saved_by_asin[result["asin"]]) for result in results]
 
 async def create_products(db: AsyncSession, products: List):
-    for product in products:
-
-        result = {
+    results = [
+        {
             "platform": product['platform'],
             "country": product['country'],
             "asin": product['asin'],
@@ -96,16 +75,16 @@ async def create_products(db: AsyncSession, products: List):
             "price": product['price'],
             "rating": product['rating']
         }
-        saved_product = await Product.find_by_asin(db, product["asin"])
-        if not saved_product:
-            await Product.create(db=db, **result)
-        else:
-            await Product.patch(db=db, **result)
+        for product in products
+    ]
+    await Product.bulk_upsert(db, results)
 
 async def display_products(db: AsyncSession, productIds: List):
     products = []
-    for asin in productIds:
-        product = await Product.find_by_asin(db, asin)
+    found_products, missing = await Product.find_many_by_asin(db, productIds)
+    if missing:
+        logger.warning(f"display_products: no stored product for asins {missing}")
+    for product in found_products:
         product_dict = {
             'platform': product.platform,
             'country': product.country,
@@ -119,30 +98,24 @@ async def display_products(db: AsyncSession, productIds: List):
         products.append(product_dict)
     return products
 
-async def get_product_images(db: AsyncSession, productId: str):
-    product = await Product.find_by_asin(db, productId)
-    return product.images
+async def get_product_images(db: AsyncSession, productId: str, country: str, platform: Optional[str] = None):
+    product = await Product.find_by_asin(db, productId, platform=platform, country=country)
+    return product.images if product else []
     
 async def add_to_cart(
         db: AsyncSession,
         user_id: str,
-        productId: str
+        productId: str,
+        country: str,
+        platform: Optional[str] = None
 ):
-    product = await Product.find_by_asin(db, productId)
-    new_product = {
-        'platform': product.platform,
-        'country': product.country,
-        'asin': product.asin,
-        'images': product.images,
-        'name': product.name[:25],
-        'price_symbol': product.price_symbol,
-        'price': product.price
-    }
-    profile = await Profile.find_by_user_id(db, user_id)
-    if profile is None:
-        raise ValueError("Profile not found")
-
-    # Update the profile's cart
-    await Profile.add_to_cart(db=db, user_id=user_id, new_product=new_product)
-    response = {"message": f"**{new_product['name']}** added to cart successfully"}
+    # Asins are only unique per (platform, country)
+    product = await Product.find_by_asin(db, productId, platform=platform, country=country)
+    if product is None:
+        logger.warning(f"add_to_cart: no stored product for asin {productId} ({platform or 'any platform'}, {country})")
+        return {"error": "not_found", "message": f"Product {productId} was not found"}
+    await CartItem.add(db=db, user_id=user_id, refs=[
+        {'platform': product.platform, 'country': product.country, 'asin': product.asin}
+    ])
+    response = {"message": f"**{product.name[:25]}** added to cart successfully"}
     return response
@@ -1,17 +1,17 @@
-import requests
-import asyncio
 from bs4 import BeautifulSoup
 from typing import List, Optional
 from datetime import datetime
 
-# Synchronous function to fetch the HTML content
-def get_html(url):
+from app.core.http import scraperclient
+
+# Fetch the HTML content through the shared scraper transport
+async def get_html(url):
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36',
         'Accept-Language': 'en-US, en;q=0.5',
         
     }
-    response = requests.get(url, headers=headers)
+    response = await scraperclient.get(url, headers=headers)
     return response.content
 
 # Function to extract product details from a single product listing
@@ -78,8 +78,7 @@ async def scrape_amazon_search_results(
     if max_price is not None:
         url += f'&high-price={max_price}'
 
-    # Call the synchronous function within the asynchronous context
-    html = await asyncio.to_thread(get_html, url)
+    html = await get_html(url)
     soup = BeautifulSoup(html, 'html.parser')
     products = soup.find_all('div', {'data-component-type': 's-search-result'})
 
@@ -146,8 +145,7 @@ async def scrape_amazon_product_page(
 ):
 
     product_url = f"https://www.amazon.{country}/dp/{asin}?language=en"
-    # Call the synchronous function within the asynchronous context
-    html = await asyncio.to_thread(get_html, product_url)
+    html = await get_html(product_url)
     product = BeautifulSoup(html, 'html.parser')
 
     product_info = extract_product_info_from_product(product)
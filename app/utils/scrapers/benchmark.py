@@ -0,0 +1,121 @@
+"""
+Offline benchmark and regression check for the scraper extraction code.
+
+Runs each extractor on recorded fixtures (no network), reports parse time
+per page, products per second and peak memory, and compares the output
+with the golden files in `fixtures/golden/`. Exits non-zero when an
+output drifts from its golden file.
+
+    python -m app.utils.scrapers.benchmark              # benchmark + check
+    python -m app.utils.scrapers.benchmark --rounds 50
+    python -m app.utils.scrapers.benchmark --update     # accept current output
+
+Fixtures: `html_sample.py` is a captured Noon search page. The Amazon
+search page and scraping API response in `fixtures/` are hand-made in
+Amazon's current markup, since no capture was recorded.
+"""
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from app.utils.scrapers.html_sample import html_sample
+from app.utils.scrapers.parse_noon import noon_parse_search
+from app.utils.scrapers.amazon import extract_product_info_from_search
+from app.utils.scrapers.scrapingfish import format_amazon_search, format_noon_search
+
+FIXTURES = Path(__file__).parent / "fixtures"
+GOLDEN = FIXTURES / "golden"
+
+
+def amazon_search_page(html: str) -> list:
+    # Same steps as amazon.scrape_amazon_search_results, minus the fetch
+    soup = BeautifulSoup(html, 'html.parser')
+    products = soup.find_all('div', {'data-component-type': 's-search-result'})
+    return [extract_product_info_from_search(product) for product in products]
+
+
+def load_cases() -> dict:
+    """
+    Returns `{name: (function, fixture)}`; each function takes the fixture
+    and returns the extracted products.
+    """
+    noon_products = noon_parse_search(html_sample)
+    return {
+        "noon_parse_search": (noon_parse_search, html_sample),
+        "amazon.extract_product_info_from_search": (
+            amazon_search_page, (FIXTURES / "amazon_search.html").read_text()),
+        "scrapingfish.format_amazon_search": (
+            lambda content: format_amazon_search(content, "ae"),
+            json.loads((FIXTURES / "scrapingfish_amazon_search.json").read_text())),
+        "scrapingfish.format_noon_search": (
+            lambda results: format_noon_search(results, "eg"), noon_products),
+    }
+
+
+def measure(fn, fixture, rounds: int) -> dict:
+    output = fn(fixture)  # warm-up, also the output checked against the golden file
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(fixture)
+    per_page = (time.perf_counter() - start) / rounds
+
+    # Measured separately, tracemalloc slows the timed runs down
+    tracemalloc.start()
+    fn(fixture)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "output": output,
+        "ms_per_page": per_page * 1000,
+        "products_per_second": len(output) / per_page if per_page else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+
+def check_golden(name: str, output: list, update: bool) -> str:
+    path = GOLDEN / f"{name}.json"
+    current = json.dumps(output, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+    if update:
+        GOLDEN.mkdir(parents=True, exist_ok=True)
+        path.write_text(current)
+        return "updated"
+    if not path.exists():
+        return "missing"
+    return "ok" if path.read_text() == current else "drift"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20, help="timed runs per case")
+    parser.add_argument("--update", action="store_true", help="rewrite the golden files")
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    args = parser.parse_args(argv)
+
+    failed = []
+    print(f"{'case':42} {'ms/page':>9} {'products/s':>11} {'peak KiB':>9} {'products':>8}  golden")
+    for name, (fn, fixture) in load_cases().items():
+        if args.only and args.only not in name:
+            continue
+        result = measure(fn, fixture, args.rounds)
+        status = check_golden(name, result["output"], args.update)
+        if status in ("drift", "missing"):
+            failed.append(name)
+        print(f"{name:42} {result['ms_per_page']:9.2f} {result['products_per_second']:11.0f} "
+              f"{result['peak_kib']:9.0f} {len(result['output']):8}  {status}")
+
+    if failed:
+        print(f"\nOutput differs from golden files for: {', '.join(failed)}")
+        print("Inspect the change, then run with --update to accept it.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
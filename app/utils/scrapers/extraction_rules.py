@@ -1,31 +1,102 @@
-extract_rules = {
-    "products": {
-        "selector": ".productContainer",
+'''
+Declarative extraction rules, compiled once by `rule_engine`.
+
+Bump `version` when a rule set changes. A JSON file at
+`settings.extraction_rules_path` with the same layout
+(`{"rules": {...}, "remote_rules": {...}}`) replaces a built-in rule set
+when its version is at least as new, so marketplace markup churn can be
+fixed without a deploy.
+
+A field's `selector` may be a list: selectors are tried in order and the
+first one that matches wins, so a renamed class is added in front of the
+old one instead of replacing it.
+'''
+
+# Parsed locally from the fetched HTML
+RULES = {
+    "noon_search": {
+        "version": 3,
+        "container": ".productContainer",
+        "exclude": ".sc-66eca60f-23.AkmCS",  # Sponsored tag
+        "limit": 8,
         "fields": {
             "asin": {
                 "selector": "a",
-                "attribute": "id"  # Fetches the `id` attribute directly
+                "attribute": "id",  # e.g. productBox-<asin>
+                "transform": "after_dash"
             },
             "name": {
-                "selector": ".sc-95ea18ef-25", #sc-26c8c6bb-24",
-                "attribute": "title"  # Fetches the `title` attribute directly
+                "selector": ['[data-qa=product-name]', ".sc-95ea18ef-25", ".sc-26c8c6bb-24", ".sc-66eca60f-24"],
+                "attribute": "title"
             },
             "currency": {
-                "selector": ".currency",  # Directly selecting the currency
-                "attribute": "text"  # Retrieves text content
+                "selector": ".currency",
+                "attribute": "text"
             },
             "price": {
-                "selector": ".amount",  # Directly selecting the price
-                "attribute": "text"  # Retrieves text content
+                "selector": ".amount",
+                "attribute": "text"
             },
             "rating": {
-                "selector": ".sc-9cb63f72-2",  # Directly selecting the rating
-                "attribute": "text"  # Retrieves text content
+                "selector": ".sc-9cb63f72-2",
+                "attribute": "text"
             },
             "images": {
-                "selector": "img",  # Selects all img elements with the specified class
-                "attribute": "src"  # Retrieves `src` attribute of each img
+                "selector": "img",
+                "attribute": "src",
+                "many": True,
+                "transform": "photo_urls"
             }
         }
-    }
+    },
+}
+
+# Sent to the scraping API, which extracts the fields remotely
+REMOTE_RULES = {
+    "amazon_search": {
+        "version": 1,
+        "extract_rules": {
+            "products": {
+                "type": "all",
+                "selector": ".s-result-item:not(.AdHolder)",
+                "output": {
+                    "asin": {
+                        "selector": ".a-declarative",
+                        "output": "@data-csa-c-item-id"
+                    },
+                    "name": {
+                        "selector": "h2",
+                        "output": "text"
+                    },
+                    "currency": ".a-price-symbol",
+                    "price": ".a-price-whole",
+                    "rating": ".a-icon-alt",
+                    "image": {
+                        "selector": ".s-image",
+                        "output": "@src"
+                    }
+                }
+            }
+        }
+    },
+    "amazon_details": {
+        "version": 1,
+        "extract_rules": {
+            "feature_bullet": {
+                "type": "all",
+                "selector": ".a-list-item.a-size-base.a-color-base",
+                "output": "text"
+            },
+            "images": {
+                "type": "all",
+                "selector": ".imageThumbnail",
+                "output": {
+                    "link": {
+                        "selector": "img",
+                        "output": "@src"
+                    }
+                }
+            }
+        }
+    },
 }
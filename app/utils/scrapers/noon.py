@@ -4,7 +4,6 @@ import requests
 import urllib.parse
 from datetime import datetime
 from bs4 import BeautifulSoup
-from extraction_rules import extract_rules
 from parse_noon import noon_parse_search
 
 def noon_search():
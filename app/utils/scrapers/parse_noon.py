@@ -1,99 +1,45 @@
 import json
-from bs4 import BeautifulSoup
-from app.utils.scrapers.extraction_rules import extract_rules
+import time
+from app.utils.scrapers.rule_engine import rule_sets, etree
 
-'''
-extract_rules = {
-    "products": {
-        "selector": ".productContainer",
-        "fields": {
-            "asin": {
-                "selector": "a",
-                "attribute": "id"  # Fetches the `id` attribute directly
-            },
-            "name": {
-                "selector": ".sc-66eca60f-24",
-                "attribute": "title"  # Fetches the `title` attribute directly
-            },
-            "currency": {
-                "selector": ".currency",  # Directly selecting the currency
-                "attribute": "text"  # Retrieves text content
-            },
-            "price": {
-                "selector": ".amount",  # Directly selecting the price
-                "attribute": "text"  # Retrieves text content
-            },
-            "rating": {
-                "selector": ".sc-9cb63f72-2",  # Directly selecting the rating
-                "attribute": "text"  # Retrieves text content
-            },
-            "images": {
-                "selector": "img",  # Selects all img elements with the specified class
-                "attribute": "src"  # Retrieves `src` attribute of each img
-            }
-        }
-    }
-}
-'''
+IMAGE_PROXY_URL = "https://api.arobah.com/image/"
 
-def noon_parse_search(data: str):
-    soup = BeautifulSoup(data, 'html.parser')
-
-    # Find all product containers
-    product_containers = soup.select(extract_rules["products"]["selector"])
-    print(product_containers)
-
-    # Initialize the list to store extracted data
-    extracted_data = []
+noon_search_rules = rule_sets["noon_search"]
 
-    # Iterate over each product container until we have 8 valid products
-    for container in product_containers:
 
-        # Check for sponsored tag
-        sponsored_tag = container.select_one('.sc-66eca60f-23.AkmCS')
+def proxy_images(products: list) -> list:
+    for product in products:
+        product['images'] = [IMAGE_PROXY_URL + image for image in product['images']]
+    return products
 
-        if sponsored_tag is None:
-            data = {}
-            # Extract the fields based on the updated rules
-            for field, rule in extract_rules["products"]["fields"].items():
-                selector = rule.get("selector")
-                attribute = rule.get("attribute")
-                
-                element = container.select_one(selector)
-                if element:
-                    if attribute == "text":
-                        data[field] = element.get_text(strip=True)
-                    else:
-                        data[field] = element.get(attribute)
-                else:
-                    data[field] = None
-            
-            # Process the ASIN if available
-            if data['asin']:
-                data['asin'] = data['asin'].split('-')[1] if '-' in data['asin'] else data['asin']
-            
-            # Collect all image URLs inside the productContainer
-            image_tags = container.find_all('img')
-            images = []
-            for img in image_tags:
-                if 'src' in img.attrs:
-                    src = img['src']
-                    # Filter for .jpg images and avoid .png or .svg images
-                    if not src.lower().endswith('.png') and not src.lower().endswith('.svg'):
-                        # Remove URL parameters
-                        parsed_url = src.split('?')[0]
-                        proxy_image_url = "https://api.arobah.com/image/" + parsed_url
-                        images.append(proxy_image_url)
-            
-            # Remove duplicates and sort images
-            data['images'] = sorted(list(set(images)))
 
-            # Append data to the list
-            extracted_data.append(data)
-
-            # Break the loop if we have enough products
-            if len(extracted_data) >= 8:
-                break
-
-    # Output the results as JSON
-    return extracted_data
+def noon_parse_search(data: str):
+    """
+    Extracts the first non-sponsored products (8 by default, see the
+    `noon_search` rules) of a Noon search page.
+
+    CPU bound; async callers run it in `app.core.workers.process_pool`.
+    """
+    return proxy_images(noon_search_rules.parse(data))
+
+
+if __name__ == "__main__":
+    # Micro-benchmark against the captured search page:
+    #   python -m app.utils.scrapers.parse_noon
+    from app.utils.scrapers.html_sample import html_sample
+
+    engines = {"soup": noon_search_rules.parse_soup}
+    if etree is not None:
+        engines["lxml"] = noon_search_rules.parse_lxml
+
+    rounds = 10
+    results = {}
+    for name, parse in engines.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results[name] = parse(html_sample, noon_search_rules.limit)
+        elapsed = (time.perf_counter() - start) / rounds
+        print(f"{name:5} {elapsed * 1000:8.1f} ms/page  {len(results[name])} products")
+
+    if len(results) > 1:
+        print("outputs match:", json.dumps(results["soup"], sort_keys=True) == json.dumps(results["lxml"], sort_keys=True))
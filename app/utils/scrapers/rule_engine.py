@@ -0,0 +1,254 @@
+import re
+import json
+import logging
+from typing import Optional
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+from app.core.config import settings
+from app.utils.scrapers.extraction_rules import RULES, REMOTE_RULES
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; fall back to BeautifulSoup
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+FEED_CHUNK_SIZE = 64 * 1024
+
+# `tag`, `.class`, `tag.class.other`, optionally followed by `[attr]` / `[attr=value]`
+SIMPLE_SELECTOR = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<classes>(?:\.[\w-]+)*)'
+    r'(?:\[(?P<attr>[\w-]+)(?:=["\']?(?P<value>[^"\'\]]*)["\']?)?\])?$'
+)
+
+
+def _after_dash(value):
+    return value.split('-')[1] if value and '-' in value else value
+
+
+def _photo_urls(values):
+    # Product photos only (no .png/.svg icons), without URL parameters
+    return sorted({
+        src.split('?')[0] for src in values
+        if not src.lower().endswith('.png') and not src.lower().endswith('.svg')
+    })
+
+
+TRANSFORMS = {
+    "after_dash": _after_dash,
+    "photo_urls": _photo_urls,
+}
+
+
+class CompiledSelector:
+    """
+    One selector compiled for both backends: an XPath for lxml trees and a
+    soupsieve pattern for BeautifulSoup trees. lxml plans support the
+    simple selectors matched by `SIMPLE_SELECTOR`.
+    """
+
+    def __init__(self, selector: str):
+        self.selector = selector
+        self.css = soupsieve.compile(selector)
+        match = SIMPLE_SELECTOR.match(selector)
+        if match is None:
+            raise ValueError(f"Unsupported extraction selector: {selector!r}")
+        self.tag = match.group('tag')
+        self.classes = [css_class for css_class in match.group('classes').split('.') if css_class]
+        self.attr = match.group('attr')
+        self.value = match.group('value')
+        self.xpath = etree.XPath(".//" + self._xpath_step()) if etree is not None else None
+
+    def _xpath_step(self) -> str:
+        step = self.tag or '*'
+        for css_class in self.classes:
+            step += f"[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+        if self.attr and self.value is not None:
+            step += f"[@{self.attr}='{self.value}']"
+        elif self.attr:
+            step += f"[@{self.attr}]"
+        return step
+
+    def matches(self, element) -> bool:
+        """
+        Tests an lxml element itself, without looking at its children, so
+        it can be used on `start` events of the pull parser.
+        """
+        if self.tag and element.tag != self.tag:
+            return False
+        if self.classes:
+            element_classes = (element.get("class") or "").split()
+            if any(css_class not in element_classes for css_class in self.classes):
+                return False
+        if self.attr:
+            value = element.get(self.attr)
+            if value is None or (self.value is not None and value != self.value):
+                return False
+        return True
+
+    def select(self, element, soup: bool) -> list:
+        return self.css.select(element) if soup else self.xpath(element)
+
+
+class CompiledField:
+    """
+    A field rule: selectors tried in order (the first that matches wins, so
+    a renamed class can be added without dropping the old one), the
+    attribute to read (`text` for the text content) and an optional
+    transform. With `many` every match of the winning selector is read.
+    """
+
+    def __init__(self, name: str, rule: dict):
+        self.name = name
+        selectors = rule["selector"]
+        self.selectors = [CompiledSelector(s) for s in ([selectors] if isinstance(selectors, str) else selectors)]
+        self.attribute = rule.get("attribute", "text")
+        self.many = rule.get("many", False)
+        self.transform = TRANSFORMS[rule["transform"]] if rule.get("transform") else None
+
+    def read(self, element, soup: bool):
+        if self.attribute == "text":
+            if soup:
+                return element.get_text(strip=True)
+            return "".join(text.strip() for text in element.itertext())
+        return element.get(self.attribute)
+
+    def extract(self, container, soup: bool):
+        value = [] if self.many else None
+        for selector in self.selectors:
+            elements = selector.select(container, soup)
+            if not elements:
+                continue
+            if self.many:
+                value = [v for v in (self.read(e, soup) for e in elements) if v is not None]
+            else:
+                value = self.read(elements[0], soup)
+            break
+        if self.transform is not None:
+            value = self.transform(value)
+        return value
+
+
+class CompiledRuleSet:
+    """
+    A versioned rule set compiled into a selector plan once, then applied
+    to every container of a page in a single pass.
+    """
+
+    def __init__(self, name: str, rules: dict):
+        self.name = name
+        self.version = rules.get("version", 1)
+        self.container = CompiledSelector(rules["container"])
+        self.exclude = CompiledSelector(rules["exclude"]) if rules.get("exclude") else None
+        self.limit = rules.get("limit")
+        self.fields = [CompiledField(field, rule) for field, rule in rules["fields"].items()]
+
+    def extract(self, container, soup: bool = False) -> dict:
+        return {field.name: field.extract(container, soup) for field in self.fields}
+
+    def excluded(self, container, soup: bool = False) -> bool:
+        return self.exclude is not None and bool(self.exclude.select(container, soup))
+
+    def parse(self, html: str, limit: Optional[int] = None) -> list[dict]:
+        """
+        Extracts up to `limit` (default: the rule set's) non-excluded
+        containers from a page.
+        """
+        limit = limit or self.limit
+        if etree is not None:
+            return self.parse_lxml(html, limit)
+        return self.parse_soup(html, limit)
+
+    def parse_lxml(self, html: str, limit: Optional[int]) -> list[dict]:
+        """
+        Feeds the page to lxml's pull parser in chunks and extracts each
+        container when its closing tag is parsed; parsing stops once
+        `limit` items are found, so the rest of the page is never read.
+        """
+        parser = etree.HTMLPullParser(events=("start", "end"))
+        extracted = []
+        open_containers = 0
+
+        for offset in range(0, len(html), FEED_CHUNK_SIZE):
+            parser.feed(html[offset:offset + FEED_CHUNK_SIZE])
+            for event, element in parser.read_events():
+                if not self.container.matches(element):
+                    if event == "end" and not open_containers:
+                        # Drop finished elements outside containers
+                        element.clear(keep_tail=False)
+                    continue
+                if event == "start":
+                    open_containers += 1
+                    continue
+
+                open_containers -= 1
+                if not self.excluded(element):
+                    extracted.append(self.extract(element))
+                element.clear(keep_tail=False)
+                if limit and len(extracted) >= limit:
+                    return extracted
+
+        return extracted
+
+    def parse_soup(self, html: str, limit: Optional[int]) -> list[dict]:
+        extracted = []
+        for container in self.container.css.select(BeautifulSoup(html, 'html.parser', parse_only=self._strainer())):
+            if self.excluded(container, soup=True):
+                continue
+            extracted.append(self.extract(container, soup=True))
+            if limit and len(extracted) >= limit:
+                break
+        return extracted
+
+    def _strainer(self) -> SoupStrainer:
+        # Keeps only candidate containers in the tree; soupsieve then applies the full selector
+        selector = self.container
+        attrs = {}
+        if selector.classes:
+            attrs["class"] = re.compile(rf"(^|\s){re.escape(selector.classes[0])}(\s|$)")
+        elif selector.attr:
+            attrs[selector.attr] = selector.value if selector.value is not None else True
+        return SoupStrainer(selector.tag, attrs=attrs)
+
+
+def load_rules(path: Optional[str] = None) -> tuple[dict, dict]:
+    """
+    Returns the built-in rules, with any rule set from the JSON file at
+    `path` replacing the built-in one when its version is at least as new.
+    The file holds `{"rules": {...}, "remote_rules": {...}}` so selectors
+    can be updated without a code change.
+    """
+    rules, remote_rules = dict(RULES), dict(REMOTE_RULES)
+    if not path:
+        return rules, remote_rules
+
+    try:
+        with open(path) as f:
+            overrides = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load extraction rules from {path}: {e}")
+        return rules, remote_rules
+
+    for builtin, override in ((rules, overrides.get("rules", {})), (remote_rules, overrides.get("remote_rules", {}))):
+        for name, rule in override.items():
+            current = builtin.get(name, {}).get("version", 0)
+            if rule.get("version", 0) >= current:
+                logger.info(f"Using extraction rules {name} v{rule.get('version', 0)} from {path}")
+                builtin[name] = rule
+    return rules, remote_rules
+
+
+def compile_rules(rules: dict) -> dict[str, CompiledRuleSet]:
+    return {name: CompiledRuleSet(name, rule) for name, rule in rules.items()}
+
+
+_rules, _remote_rules = load_rules(settings.extraction_rules_path)
+
+# Compiled once at import and shared by every scraper
+rule_sets = compile_rules(_rules)
+
+# Scraping-API extract_rules, serialized once instead of on every request
+remote_rules = {name: json.dumps(rule["extract_rules"]) for name, rule in _remote_rules.items()}
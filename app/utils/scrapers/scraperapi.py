@@ -1,17 +1,19 @@
 from dotenv import load_dotenv
 import os
 from typing import List, Optional
-import requests
 import json
 from app.models import Product
+from app.core.http import scraperclient
+from app.core.config import settings
+from app.core.metrics import scraper_metrics
 from sqlalchemy.ext.asyncio import AsyncSession
-from bs4 import BeautifulSoup
-from extraction_rules import extract_rules
+from app.utils.scrapers.rule_engine import rule_sets
 
 # Load environment variables from the .env file
 load_dotenv()
 
 API_KEY = os.getenv("SCRAPERAPI_API_KEY")
+SCRAPERAPI_URL = settings.scraperapi_url
 
 localization = {
     "ae": {"url": "https://www.amazon.ae", "currency": "AED"},
@@ -21,6 +23,7 @@ localization = {
 }
 
 
+@scraper_metrics("amazon", "search")
 async def amazon_search(
         country: str,
         keywords: List[str],
@@ -48,7 +51,7 @@ async def amazon_search(
         'premimum': True
     }
 
-    r = requests.get('https://api.scraperapi.com/', params=params)
+    r = await scraperclient.get(SCRAPERAPI_URL, params=params)
     results = json.loads(r.text)
     products_dict = []
     for product in results['results'][:7]:
@@ -66,6 +69,7 @@ async def amazon_search(
 
     return products_dict
 
+@scraper_metrics("amazon", "details")
 async def amazon_products_details(db: AsyncSession, productId: str, country: str):
     url = f'https://amazon.{country}/dp/{productId}?language=en'
 
@@ -77,11 +81,11 @@ async def amazon_products_details(db: AsyncSession, productId: str, country: str
         'autoparse': 'true',
         'device_type': 'desktop'
     }
-    r = requests.get('https://api.scraperapi.com/', params=params)
+    r = await scraperclient.get(SCRAPERAPI_URL, params=params)
 
     product_details = json.loads(r.text)
 
-    saved_product = await Product.find_by_asin(db,productId)
+    saved_product = await Product.find_by_asin(db, productId, platform="amazon", country=country)
 
     new_params = {
         "platform": "amazon",
@@ -99,6 +103,7 @@ async def amazon_products_details(db: AsyncSession, productId: str, country: str
 
 
 
+@scraper_metrics("noon", "search")
 async def noon_search(
         country: str,
         keywords: List[str],
@@ -132,51 +137,12 @@ async def noon_search(
         'premimum': True
     }
 
-    r = requests.get('https://api.scraperapi.com/', params=params)
+    r = await scraperclient.get(SCRAPERAPI_URL, params=params)
     results = json.loads(r.text)
 
     
-    soup = BeautifulSoup(results, 'html.parser')
-
-    # Find all product containers
-    product_containers = soup.select(extract_rules["products"]["selector"])
-
-    # Initialize the list to store extracted data
-    extracted_data = []
-
-    # Iterate over each product container
-    for container in product_containers[:10]:
-        data = {}
-        # Extract the fields based on the updated rules
-        for field, rule in extract_rules["products"]["fields"].items():
-            selector = rule.get("selector")
-            attribute = rule.get("attribute")
-            
-            element = container.select_one(selector)
-            if element:
-                if attribute == "text":
-                    data[field] = element.get_text(strip=True)
-                else:
-                    data[field] = element.get(attribute)
-            else:
-                data[field] = None
-        data['asin'] = data['asin'].split('-')[1]
-        # Collect all image URLs inside the productContainer
-        image_tags = container.find_all('img')
-        images = []
-        for img in image_tags:
-            if 'src' in img.attrs:
-                src = img['src']
-                # Filter for .jpg images
-                if not src.lower().endswith('.png') and not src.lower().endswith('.svg'):
-                    # Remove URL parameters
-                    parsed_url = src.split('?')[0]
-                    images.append(parsed_url)
-        
-        data['images'] = sorted(list(set(images)))
-
-        # Append data to the list
-        extracted_data.append(data)
+    # Extract the product containers with the compiled noon_search rules
+    extracted_data = rule_sets["noon_search"].parse(results, limit=10)
 
     # Output the results as JSON
     return json.dumps(extracted_data, indent=4, ensure_ascii=False)
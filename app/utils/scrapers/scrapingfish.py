@@ -1,14 +1,21 @@
-import requests
 import json
+import asyncio
 import logging
 import sys
 from dotenv import load_dotenv
 import os
 import urllib.parse
-from typing import Optional, List
+from typing import Awaitable, Callable, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.http import scraperclient
+from app.core.singleflight import SingleFlight
+from app.core.workers import process_pool
+from app.core.metrics import scraper_metrics
+from app.core.config import settings
 from app.utils.scrapers.parse_noon import noon_parse_search
+from app.utils.scrapers.rule_engine import remote_rules
+from app.utils.scrapers.search_cache import cached_search
 from app.models import Product
 
 
@@ -29,60 +36,31 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 API_KEY = os.getenv("SCRAPING_FISH_API_KEY")
+SCRAPING_API_URL = settings.scraping_api_url
 
+# Identical scrapes issued concurrently share one upstream request
+scrapes_in_flight = SingleFlight(timeout=settings.scraper_singleflight_timeout)
 
-async def amazon_search(
-        country: str,
-        keywords: List[str],
-        search_index: str,
-        min_price: Optional[int] = None,
-        max_price: Optional[int] = None
-):
-    query = "+".join(keywords)
 
-    url = f'https://amazon.{country}/s?language=en&k={query}&i={search_index}'
+async def _fetch(payload: dict) -> str:
+    response = await scraperclient.get(SCRAPING_API_URL, params=payload)
+    return response.content.decode('utf-8')
 
-    # Add price filters to the URL if provided
-    if min_price is not None:
-        url += f'&low-price={min_price}'
-    if max_price is not None:
-        url += f'&high-price={max_price}'
-
-    payload = {
-    "api_key": API_KEY,
-    "url": url,
-    "extract_rules": json.dumps({
-        "products": {
-            "type": "all",
-            "selector": ".s-result-item:not(.AdHolder)",
-            "output": {
-                "asin": {
-                    "selector": ".a-declarative",
-                    "output": "@data-csa-c-item-id"
-                },
-                "name": {
-                    "selector": "h2",
-                    "output": "text"
-                },
-                "currency": ".a-price-symbol",
-                "price": ".a-price-whole",
-                "rating": ".a-icon-alt",
-                "image": {
-                    "selector": ".s-image",
-                    "output": "@src"
-                }
-            }
-        }
-    })
-    }
 
+async def scrape(payload: dict) -> str:
+    """
+    Fetches a page through the scraping API, coalescing concurrent requests
+    for the same URL and extraction rules into a single upstream call.
+    """
+    key = tuple(sorted((k, v) for k, v in payload.items() if k != "api_key"))
+    return await scrapes_in_flight.do(key, _fetch, payload)
 
-    response = requests.get("https://scraping.narf.ai/api/v1/", params=payload)
 
-    # Parse the JSON response
-    content = json.loads(response.content.decode('utf-8'))
-
-    # Initialize the results string
+def format_amazon_search(content: dict, country: str) -> list:
+    """
+    Converts the scraping API's extracted Amazon search results into
+    product dicts, skipping items without an asin or price.
+    """
     products_dict = []
 
     # Iterate over the products
@@ -108,36 +86,69 @@ async def amazon_search(
             products_dict.append(result)
     return products_dict
 
-async def amazon_products_details(db: AsyncSession, productId: str, country: str):
-   
-    saved_product = await Product.find_by_asin(db,productId)
+
+@cached_search("amazon")
+@scraper_metrics("amazon", "search")
+async def amazon_search(
+        country: str,
+        keywords: List[str],
+        search_index: str,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None
+):
+    query = "+".join(keywords)
+
+    url = f'https://amazon.{country}/s?language=en&k={query}&i={search_index}'
+
+    # Add price filters to the URL if provided
+    if min_price is not None:
+        url += f'&low-price={min_price}'
+    if max_price is not None:
+        url += f'&high-price={max_price}'
+
+    payload = {
+    "api_key": API_KEY,
+    "url": url,
+    "extract_rules": remote_rules["amazon_search"]
+    }
+
+
+    response = await scrape(payload)
+
+    return format_amazon_search(json.loads(response), country)
+
+@scraper_metrics("amazon", "details")
+async def scrape_amazon_details(productId: str, country: str) -> dict:
+    url = f'https://amazon.{country}/dp/{productId}?language=en'
+    payload = {
+    "api_key": API_KEY,
+    "url": url,
+    "extract_rules": remote_rules["amazon_details"]
+    }
+    response = await scrape(payload)
+    return json.loads(response)
+
+
+async def amazon_products_details(
+        db: AsyncSession,
+        productId: str,
+        country: str,
+        run_db: Optional[Callable[[Callable[[], Awaitable]], Awaitable]] = None
+):
+    """
+    Returns the product's details, scraping and storing them on first use.
+
+    `run_db(work)` runs the database reads and writes when `db` is shared by
+    concurrent callers (see `ToolExecutor.run_db`); the scrape runs outside it.
+    """
+    run_db = run_db or (lambda work: work())
+    saved_product = await run_db(
+        lambda: Product.find_by_asin(db, productId, platform="amazon", country=country)
+    )
 
     if not saved_product.feature_bullets:       
-        url = f'https://amazon.{country}/dp/{productId}?language=en'
-        payload = {
-        "api_key": API_KEY,
-        "url": url,
-        "extract_rules": json.dumps({
-            
-            "feature_bullet": {
-                "type": "all",
-                "selector": ".a-list-item.a-size-base.a-color-base",
-                "output": "text"
-            },
-            "images":{
-                "type": "all",
-                "selector": ".imageThumbnail",
-                "output": {
-                    "link": {
-                        "selector": "img",
-                        "output": "@src"
-                    }
-            }}
-                })
-        }
-        response = requests.get("https://scraping.narf.ai/api/v1/", params=payload)
-        # Parse the JSON response
-        product_details = json.loads(response.content.decode('utf-8'))
+        # Stored details are served without an upstream call, so only this branch is metered
+        product_details = await scrape_amazon_details(productId, country)
         images = []
         for image in product_details['images']:
             link = image['link'].split('_')[0] + 'jpg'
@@ -157,12 +168,14 @@ async def amazon_products_details(db: AsyncSession, productId: str, country: str
             "feature_bullets": feature_bullets,
             "images": images
         }
-        await Product.patch(
+        await run_db(lambda: Product.patch(
             db=db,
             asin=productId,
+            platform="amazon",
+            country=country,
             feature_bullets=new_params['feature_bullets'],
             images= new_params['images']
-        )
+        ))
     else:
         new_params = {
             "platform": "amazon",
@@ -180,6 +193,37 @@ async def amazon_products_details(db: AsyncSession, productId: str, country: str
 
 
 
+def format_noon_search(results: list, country: str) -> list:
+    """
+    Converts products extracted from a Noon search page into product dicts.
+    """
+    products_dict = []
+    for product in results:
+        if len(product['images']) >0:
+            images = product['images']
+        else:
+            images = ['https://upload.wikimedia.org/wikipedia/commons/thumb/c/ca/Noon_Website_Logo.svg/260px-Noon_Website_Logo.svg.png']
+        if product['rating']:
+                rating = float(product['rating'].split(' ')[0])
+        else:
+                rating = 3.4
+        result = {
+            "platform": "noon",
+            "country": country,
+            "asin": product['asin'],
+            "name": product['name'],
+            "images": images,
+            "currency": product.get('currency', "Price on selection"),
+            "price": float(product.get('price', 0).replace(',', '')),
+            "rating": rating
+        }
+        products_dict.append(result)
+
+    return products_dict
+
+
+@cached_search("noon")
+@scraper_metrics("noon", "search")
 async def noon_search(
         country: str,
         keywords: List[str],
@@ -212,39 +256,17 @@ async def noon_search(
     "js_scenario": json.dumps({"steps": [ {"wait": 250}]}) 
     }
 
-    response = requests.get("https://scraping.narf.ai/api/v1/", params=payload)
+    response = await scrape(payload)
 
     # Parse the JSON response
-    results = noon_parse_search(response.content.decode('utf-8'))
-
-    products_dict = []
-    for product in results:
-        if len(product['images']) >0:
-            images = product['images']
-        else:
-            images = ['https://upload.wikimedia.org/wikipedia/commons/thumb/c/ca/Noon_Website_Logo.svg/260px-Noon_Website_Logo.svg.png']
-        if product['rating']:
-                rating = float(product['rating'].split(' ')[0])
-        else:
-                rating = 3.4
-        result = {
-            "platform": "noon",
-            "country": country,
-            "asin": product['asin'],
-            "name": product['name'],
-            "images": images,
-            "currency": product.get('currency', "Price on selection"),
-            "price": float(product.get('price', 0).replace(',', '')),
-            "rating": rating
-        }
-        products_dict.append(result)
+    results = await process_pool.run(noon_parse_search, response)
 
-    return products_dict
+    return format_noon_search(results, country)
 
 
 
 async def noon_products_details(db: AsyncSession, productId: str, country: str):
-   saved_product = await Product.find_by_asin(db,productId)
+   saved_product = await Product.find_by_asin(db, productId, platform="noon", country=country)
    new_params = {
     "platform": "noon",
     "country": country,
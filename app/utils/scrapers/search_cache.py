@@ -0,0 +1,74 @@
+import functools
+from typing import List, Optional
+
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.logs.logger import logger
+
+search_cache = TieredCache(
+    "search",
+    maxsize=settings.search_cache_maxsize,
+    ttl=settings.search_cache_ttl,
+)
+
+
+def normalize_keywords(keywords: List[str]) -> List[str]:
+    """
+    Lower-cases and splits the keywords into unique sorted terms so that
+    ["Wireless Keyboard"] and ["keyboard", "wireless"] share a cache entry.
+    """
+    terms = {term for keyword in keywords for term in keyword.lower().split()}
+    return sorted(terms)
+
+
+def search_cache_key(
+        platform: str,
+        country: str,
+        keywords: List[str],
+        search_index: str,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None
+) -> str:
+    return "|".join([
+        platform,
+        country.lower(),
+        "+".join(normalize_keywords(keywords)),
+        (search_index or "").lower(),
+        str(min_price or ""),
+        str(max_price or ""),
+    ])
+
+
+def cached_search(platform: str):
+    """
+    Caches a marketplace search function's results by normalized query,
+    search index, country and price band. Empty results are not cached so a
+    failed or blocked scrape is retried on the next call.
+    """
+    def decorator(search_fn):
+        @functools.wraps(search_fn)
+        async def wrapper(
+                country: str,
+                keywords: List[str],
+                search_index: str,
+                min_price: Optional[int] = None,
+                max_price: Optional[int] = None
+        ):
+            key = search_cache_key(platform, country, keywords, search_index, min_price, max_price)
+            products = await search_cache.get(key)
+            if products is not None:
+                logger.info(f"Search cache hit: {key}")
+                return products
+
+            products = await search_fn(
+                country=country,
+                keywords=keywords,
+                search_index=search_index,
+                min_price=min_price,
+                max_price=max_price,
+            )
+            if products:
+                await search_cache.set(key, products)
+            return products
+        return wrapper
+    return decorator
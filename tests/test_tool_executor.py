@@ -0,0 +1,74 @@
+import json
+import asyncio
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.agents.chatAgent import search_agent
+from app.agents.chatAgent.search_agent import ChainTools
+
+
+class FakeSession:
+    """
+    Breaks like an asyncpg connection when a statement is cancelled midway.
+    """
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.busy = False
+        self.broken = False
+        self.statements = 0
+        self.committed = False
+
+    async def execute(self):
+        if self.broken or self.busy:
+            raise RuntimeError("session unusable")
+        self.busy = True
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.broken = True
+            raise
+        finally:
+            self.busy = False
+        self.statements += 1
+
+    async def commit(self):
+        if self.broken or self.busy:
+            raise RuntimeError("session unusable")
+        self.committed = True
+
+
+def tool_call(name: str, arguments: dict):
+    return SimpleNamespace(
+        id=f"call_{name}",
+        type="function",
+        function=SimpleNamespace(name=name, arguments=json.dumps(arguments)),
+    )
+
+
+def test_timed_out_tool_finishes_its_statement_and_the_turn_saves(monkeypatch):
+    session = FakeSession(delay=0.2)
+
+    async def slow_add_to_cart(db, user_id, productId, country, platform=None):
+        await db.execute()
+        return "Added to cart"
+
+    monkeypatch.setattr(search_agent, "add_to_cart", slow_add_to_cart)
+    monkeypatch.setitem(settings.tool_timeouts, "add_to_cart", 0.05)
+
+    async def turn():
+        state = SimpleNamespace(
+            user_id="user", country="ae", amazon_products=[], noon_products=[], added_to_cart=[], tool_calls=[]
+        )
+        tools = ChainTools(SimpleNamespace(db=session), state)
+        next_step = await tools.run([tool_call("add_to_cart", {"productId": "B0TEST"})])
+        # What save_interaction and the request's commit do next
+        await session.commit()
+        return state, next_step
+
+    state, next_step = asyncio.run(turn())
+
+    assert next_step == "top_picks"
+    assert state.tool_calls[0]["response"] == "Tool add_to_cart timed out"
+    assert session.statements == 1
+    assert not session.broken
+    assert session.committed